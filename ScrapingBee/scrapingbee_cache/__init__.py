@@ -1 +1,4 @@
-from .cache import get_html 
\ No newline at end of file
+from .cache import HTMLCache, FetchResult, get_html, get_html_many, get_default_cache, set_default_cache
+from .client import ScrapingBeeClient, get_default_client, set_default_client
+from .utils import normalize_url, url_to_key
+from .metrics import Metrics
@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .locks import atomic_write, file_lock
+from .utils import key_to_relpath
+
+# Optional: LMDB backend (pip install lmdb)
+try:
+    import lmdb  # type: ignore
+except ImportError:  # the LMDB backend is simply unavailable
+    lmdb = None
+
+BACKENDS = ("filesystem", "sqlite", "lmdb")
+
+# Cross-process fetch locks are striped over this many files (by key prefix)
+# rather than one lock file per entry
+LOCK_STRIPES_HEX_DIGITS = 3
+
+
+class CacheBackend:
+    """
+    Storage interface used by HTMLCache. Entries are addressed by cache key (the URL
+    hash) and consist of a stored blob (possibly compressed HTML) and a metadata dict.
+    """
+
+    name = ""
+
+    def __init__(self, lock_dir: str):
+        self.lock_dir = lock_dir
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Returns the stored blob of the entry, or None if it does not exist."""
+        raise NotImplementedError
+
+    def read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the metadata of the entry, or None if it does not exist."""
+        raise NotImplementedError
+
+    def write(self, key: str, blob: bytes, meta: Dict[str, Any]) -> None:
+        """Creates or replaces an entry."""
+        raise NotImplementedError
+
+    def write_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        """Replaces the metadata of an existing entry."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Removes an entry; missing entries are ignored."""
+        raise NotImplementedError
+
+    def iter_meta(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yields (key, metadata) for every entry."""
+        raise NotImplementedError
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Holds a cross-process lock for the key (striped by key prefix).
+        """
+        with file_lock(os.path.join(self.lock_dir, key[:LOCK_STRIPES_HEX_DIGITS] + ".lock")):
+            yield
+
+    def close(self) -> None:
+        pass
+
+
+class FilesystemBackend(CacheBackend):
+    """
+    One file per entry under two levels of shard directories:
+    <root>/ab/cd/<key>.html with a <key>.json metadata sidecar.
+    """
+
+    name = "filesystem"
+
+    def __init__(self, root: str):
+        super().__init__(os.path.join(root, ".locks"))
+        self.root = root
+
+    def paths(self, key: str) -> Tuple[str, str]:
+        """
+        Returns the (blob path, metadata path) of the entry.
+        """
+        shard, stem = key_to_relpath(key)
+        base = os.path.join(self.root, shard, stem)
+        return base + ".html", base + ".json"
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.paths(key)[0], "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.paths(key)[1], "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: str, blob: bytes, meta: Dict[str, Any]) -> None:
+        blob_path, _ = self.paths(key)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        atomic_write(blob_path, blob)
+        self.write_meta(key, meta)
+
+    def write_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        atomic_write(self.paths(key)[1], json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def delete(self, key: str) -> None:
+        for path in self.paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def iter_meta(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                key = name[:-len(".json")]
+                if meta.get("stored_size") is None:
+                    blob_path = os.path.join(root, key + ".html")
+                    meta["stored_size"] = os.path.getsize(blob_path) if os.path.exists(blob_path) else 0
+                yield key, meta
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Single-file store: one row per entry in a WAL-mode SQLite database, keyed by the
+    URL hash, with the blob stored inline and an index on access time for eviction.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        super().__init__(path + ".locks")
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " meta TEXT NOT NULL,"
+                " accessed_at REAL NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads: keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def read(self, key: str) -> Optional[bytes]:
+        row = self._connect().execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT meta FROM entries WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write(self, key: str, blob: bytes, meta: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, data, meta, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(blob), json.dumps(meta, ensure_ascii=False), meta.get("accessed_at", 0)),
+            )
+
+    def write_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE entries SET meta = ?, accessed_at = ? WHERE key = ?",
+                (json.dumps(meta, ensure_ascii=False), meta.get("accessed_at", 0), key),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def iter_meta(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rows = self._connect().execute("SELECT key, meta FROM entries").fetchall()
+        for key, meta in rows:
+            yield key, json.loads(meta)
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class LMDBBackend(CacheBackend):
+    """
+    Single memory-mapped LMDB environment with separate databases for blobs and
+    metadata. Reads are served straight from the map without extra copies on disk.
+    """
+
+    name = "lmdb"
+
+    def __init__(self, path: str, map_size: int = 16 * 1024 ** 3):
+        if lmdb is None:
+            raise RuntimeError("The LMDB cache backend requires the 'lmdb' package (pip install lmdb).")
+        super().__init__(path + ".locks")
+        self.path = path
+        # map_size is the maximum size of the store; the file grows sparsely up to it
+        self.env = lmdb.open(path, map_size=map_size, max_dbs=2, subdir=True)
+        self._data = self.env.open_db(b"data")
+        self._meta = self.env.open_db(b"meta")
+
+    def read(self, key: str) -> Optional[bytes]:
+        with self.env.begin(db=self._data) as txn:
+            value = txn.get(key.encode("ascii"))
+        return bytes(value) if value is not None else None
+
+    def read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.env.begin(db=self._meta) as txn:
+            value = txn.get(key.encode("ascii"))
+        return json.loads(value) if value is not None else None
+
+    def write(self, key: str, blob: bytes, meta: Dict[str, Any]) -> None:
+        with self.env.begin(write=True) as txn:
+            txn.put(key.encode("ascii"), blob, db=self._data)
+            txn.put(key.encode("ascii"), json.dumps(meta, ensure_ascii=False).encode("utf-8"), db=self._meta)
+
+    def write_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        with self.env.begin(write=True, db=self._meta) as txn:
+            txn.put(key.encode("ascii"), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def delete(self, key: str) -> None:
+        with self.env.begin(write=True) as txn:
+            txn.delete(key.encode("ascii"), db=self._data)
+            txn.delete(key.encode("ascii"), db=self._meta)
+
+    def iter_meta(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with self.env.begin(db=self._meta) as txn:
+            items = [(key.decode("ascii"), json.loads(value)) for key, value in txn.cursor()]
+        return iter(items)
+
+    def close(self) -> None:
+        self.env.close()
+
+
+def open_backend(name: str, cache_dir: str, path: Optional[str] = None) -> CacheBackend:
+    """
+    Creates a backend by name.
+    - "filesystem" stores entries under `cache_dir` (or `path`).
+    - "sqlite" and "lmdb" default to cache.sqlite3 / cache.lmdb inside `cache_dir`.
+    """
+    if name == "filesystem":
+        return FilesystemBackend(path or cache_dir)
+    if name == "sqlite":
+        return SQLiteBackend(path or os.path.join(cache_dir, "cache.sqlite3"))
+    if name == "lmdb":
+        return LMDBBackend(path or os.path.join(cache_dir, "cache.lmdb"))
+    raise ValueError(f"Unknown cache backend {name!r}; expected one of {', '.join(BACKENDS)}")
@@ -1,7 +1,27 @@
+import copy
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
 from dotenv import load_dotenv
 import requests
-from .utils import url_to_filename
+from .client import ScrapingBeeClient, get_default_client
+from .backends import CacheBackend, FilesystemBackend, open_backend
+from .compression import check_codec, compress, decompress
+from .locks import SingleFlight
+from .memory import MemoryCache
+from .metrics import Metrics
+from .utils import (
+    conditional_headers,
+    parse_duration,
+    parse_size,
+    response_validators,
+    url_to_filename,
+    url_to_key,
+)
 
 # Load .env file (only runs on first import)
 load_dotenv()
@@ -9,31 +29,533 @@ load_dotenv()
 CACHE_DIR = "cache"
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+CACHE_BACKEND = os.getenv("SCRAPINGBEE_CACHE_BACKEND", "filesystem")
+# Optional location of the sqlite/lmdb store (default: inside CACHE_DIR)
+CACHE_PATH = os.getenv("SCRAPINGBEE_CACHE_PATH") or None
+CACHE_CODEC = os.getenv("SCRAPINGBEE_CACHE_CODEC", "none")
+# 0 disables expiry / the size budget
+CACHE_MAX_AGE = parse_duration(os.getenv("SCRAPINGBEE_CACHE_MAX_AGE", "0"))
+CACHE_MAX_BYTES = parse_size(os.getenv("SCRAPINGBEE_CACHE_MAX_BYTES", "0"))
+MEMORY_CACHE_BYTES = parse_size(os.getenv("SCRAPINGBEE_MEMORY_CACHE_BYTES", "64MB"))
+# Revalidate expired entries with conditional requests instead of refetching them,
+# optionally straight from the target site instead of through ScrapingBee
+CACHE_REVALIDATE = os.getenv("SCRAPINGBEE_CACHE_REVALIDATE", "").lower() in ("1", "true", "yes")
+REVALIDATE_DIRECT = os.getenv("SCRAPINGBEE_REVALIDATE_DIRECT", "").lower() in ("1", "true", "yes")
 
-def get_html(url: str) -> str:
+# Seconds between access-time updates of an entry's metadata
+ACCESS_TIME_RESOLUTION = 60
+
+
+class FetchResult(NamedTuple):
+    """
+    One result yielded by get_html_many.
+    - html is None and error is set when the fetch failed.
+    - from_cache tells whether the page was served without calling ScrapingBee.
+    """
+    url: str
+    html: Optional[str]
+    error: Optional[Exception]
+    from_cache: bool
+
+
+class _LRUIndex:
+    """
+    In-process view of the cache's entries in least-recently-used order.
+    Built with one scan of the backend on first use, then kept up to date incrementally.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.loaded = False
+
+    def reset(self) -> None:
+        self.entries.clear()
+        self.total_bytes = 0
+        self.loaded = False
+
+    def add(self, key: str, stored_size: int) -> None:
+        self.total_bytes += stored_size - self.entries.pop(key, 0)
+        self.entries[key] = stored_size
+
+    def discard(self, key: str) -> None:
+        self.total_bytes -= self.entries.pop(key, 0)
+
+
+class HTMLCache:
+    """
+    Persistent HTML cache in front of ScrapingBee.
+    - Entries are content-addressed by the SHA-256 of the normalized URL and kept in a
+      storage `backend`: "filesystem" (default; sharded files <cache_dir>/ab/cd/<key>.html),
+      "sqlite" or "lmdb" (single-file stores), a CacheBackend instance, or
+      SCRAPINGBEE_CACHE_BACKEND / SCRAPINGBEE_CACHE_PATH.
+    - Each entry has metadata with the original URL, fetch time, last access time,
+      status code and response headers.
+    - Entries from the old flat layout in `cache_dir` are migrated the first time they are read.
+    - New entries are written with `codec` ("none", "gzip" or "zstd"); reads detect the
+      codec of each entry, so changing it never invalidates existing entries.
+    - Entries older than `max_age` seconds are refetched; when `max_bytes` is set, the
+      least recently used entries are evicted as new ones are stored.
+    - Recently used pages are also held in an in-process LRU of `memory_bytes`
+      (0 disables it), so repeated reads skip the disk entirely.
+    - Concurrent misses for one URL are coalesced into a single ScrapingBee request,
+      within a process (threads share the result) and across processes sharing the
+      store (a file lock, then a re-check of the cache). Writes are atomic.
+    - With `revalidate`, expired entries are refreshed with a conditional request
+      (ETag / Last-Modified) and only rewritten if the page content changed;
+      `revalidate_direct` sends those requests to the site instead of ScrapingBee.
+    - Hits, misses, bytes, errors and lookup / disk read / fetch timings are recorded
+      in `metrics` (see stats(), Metrics.to_json() and Metrics.to_prometheus()).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        client: Optional[ScrapingBeeClient] = None,
+        codec: Optional[str] = None,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        memory_bytes: Optional[int] = None,
+        revalidate: Optional[bool] = None,
+        revalidate_direct: Optional[bool] = None,
+        backend: Optional[Union[str, CacheBackend]] = None,
+    ):
+        self.cache_dir = cache_dir or CACHE_DIR
+        if not isinstance(backend, CacheBackend):
+            backend = open_backend(backend or CACHE_BACKEND, self.cache_dir, None if backend else CACHE_PATH)
+        self.backend = backend
+        self.client = client
+        self.codec = check_codec(codec or CACHE_CODEC)
+        self.max_age = CACHE_MAX_AGE if max_age is None else max_age
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._index = _LRUIndex()
+        self.memory = MemoryCache(MEMORY_CACHE_BYTES if memory_bytes is None else memory_bytes)
+        self._inflight = SingleFlight()
+        self.metrics = Metrics()
+        self.revalidate_expired = CACHE_REVALIDATE if revalidate is None else revalidate
+        self.revalidate_direct = REVALIDATE_DIRECT if revalidate_direct is None else revalidate_direct
+
+    def _client(self) -> ScrapingBeeClient:
+        return self.client or get_default_client()
+
+    def with_client(self, client: ScrapingBeeClient) -> "HTMLCache":
+        """
+        Returns a view of this cache (same settings and state) that fetches through `client`.
+        """
+        view = copy.copy(self)
+        view.client = client
+        return view
+
+    def paths(self, url: str) -> Tuple[str, str]:
+        """
+        Returns the (html path, metadata path) of the entry for the given URL.
+        Only available with the filesystem backend.
+        """
+        if not isinstance(self.backend, FilesystemBackend):
+            raise TypeError(f"The {self.backend.name} backend does not store entries as files")
+        return self.backend.paths(url_to_key(url))
+
+    def _is_fresh(self, meta: Dict[str, Any], max_age: Optional[float], now: float) -> bool:
+        max_age = self.max_age if max_age is None else max_age
+        if not max_age:
+            return True
+        return now - meta.get("fetched_at", 0) <= max_age
+
+    def load(self, url: str, max_age: Optional[float] = None) -> Optional[str]:
+        """
+        Returns the cached HTML of the URL, or None if it is not cached or has expired.
+        - `max_age` overrides the cache's default for this lookup (seconds, 0 = never expires).
+        """
+        with self.metrics.timer("lookup_seconds"):
+            html = self._lookup(url, max_age)
+        if html is None:
+            self.metrics.inc("misses_total")
+        return html
+
+    def _lookup(self, url: str, max_age: Optional[float]) -> Optional[str]:
+        key = url_to_key(url)
+        now = time.time()
+        cached = self.memory.get(key)
+        if cached is not None:
+            html, fetched_at = cached
+            if self._is_fresh({"fetched_at": fetched_at}, max_age, now):
+                with self._index.lock:
+                    if key in self._index.entries:
+                        self._index.entries.move_to_end(key)
+                self.metrics.inc("memory_hits_total")
+                return html
+        meta = self.backend.read_meta(key)
+        if meta is None:
+            html = self._migrate_legacy(url)
+            if html is not None:
+                self.metrics.inc("disk_hits_total")
+            return html
+        if not self._is_fresh(meta, max_age, now):
+            self.metrics.inc("expired_total")
+            return None
+        with self.metrics.timer("disk_read_seconds"):
+            blob = self.backend.read(key)
+            if blob is None:
+                return None
+            html = decompress(blob).decode("utf-8")
+        self.metrics.inc("disk_hits_total")
+        self.metrics.inc("bytes_read_total", len(blob))
+        self._touch(key, meta, now)
+        self.memory.put(key, html, meta.get("fetched_at", 0))
+        return html
+
+    def _touch(self, key: str, meta: Dict[str, Any], now: float) -> None:
+        # Access times only need to be accurate enough to order evictions, so the
+        # metadata is rewritten at most once per ACCESS_TIME_RESOLUTION per entry
+        if now - meta.get("accessed_at", 0) >= ACCESS_TIME_RESOLUTION:
+            meta["accessed_at"] = now
+            self.backend.write_meta(key, meta)
+        with self._index.lock:
+            if key in self._index.entries:
+                self._index.entries.move_to_end(key)
+
+    def load_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the metadata of the URL's entry, or None if it is not cached.
+        """
+        return self.backend.read_meta(url_to_key(url))
+
+    def store(self, url: str, html: str, response: Optional[requests.Response] = None, fetched_at: Optional[float] = None) -> None:
+        """
+        Saves the HTML of the URL together with its metadata, then evicts the
+        least recently used entries if the cache is over its size budget.
+        """
+        key = url_to_key(url)
+        data = html.encode("utf-8")
+        blob = compress(data, self.codec)
+        now = time.time()
+        meta = {
+            "url": url,
+            "key": key,
+            "fetched_at": now if fetched_at is None else fetched_at,
+            "accessed_at": now,
+            "status": response.status_code if response is not None else None,
+            "headers": dict(response.headers) if response is not None else {},
+            "codec": self.codec,
+            "size": len(data),
+            "stored_size": len(blob),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        if response is not None:
+            meta.update(response_validators(response.headers))
+        self.backend.write(key, blob, meta)
+        self.memory.put(key, html, meta["fetched_at"])
+        if self.max_bytes:
+            self._account(key, len(blob))
+
+    def _account(self, key: str, stored_size: int) -> None:
+        index = self._index
+        with index.lock:
+            if not index.loaded:
+                entries = sorted(self.backend.iter_meta(), key=lambda e: e[1].get("accessed_at", 0))
+                for entry_key, meta in entries:
+                    index.add(entry_key, meta.get("stored_size", 0))
+                index.loaded = True
+            index.add(key, stored_size)
+            # Evict from the cold end only; never the entry that was just written
+            while index.total_bytes > self.max_bytes and len(index.entries) > 1:
+                victim = next(iter(index.entries))
+                if victim == key:
+                    break
+                index.discard(victim)
+                self.metrics.inc("evictions_total")
+                self._remove(victim)
+
+    def _remove(self, key: str) -> None:
+        self.memory.discard(key)
+        self.backend.delete(key)
+
+    def delete(self, url: str) -> None:
+        """
+        Removes the URL's entry from the cache, if present.
+        """
+        key = url_to_key(url)
+        with self._index.lock:
+            self._index.discard(key)
+        self._remove(key)
+
+    def _migrate_legacy(self, url: str) -> Optional[str]:
+        legacy_path = os.path.join(self.cache_dir, url_to_filename(url))
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                html = f.read()
+            fetched_at = os.path.getmtime(legacy_path)
+        except OSError:
+            # Missing, or the legacy name was too long for the filesystem
+            return None
+        self.store(url, html, fetched_at=fetched_at)
+        os.remove(legacy_path)
+        return html
+
+    def migrate_legacy(self, urls: Iterable[str]) -> int:
+        """
+        Moves the old flat-layout entries of the given URLs into the sharded layout.
+        Returns the number of migrated entries. Legacy filenames are lossy, so the
+        original URLs must be supplied (e.g. from output.json or a crawl list).
+        """
+        migrated = 0
+        for url in urls:
+            if self.backend.read_meta(url_to_key(url)) is None and self._migrate_legacy(url) is not None:
+                migrated += 1
+        return migrated
+
+    def storage_stats(self) -> Dict[str, int]:
+        """
+        Returns entry count, original and stored byte totals, and bytes saved by compression.
+        Scans every entry's metadata, so it is meant for reporting, not hot paths.
+        """
+        stats = {"entries": 0, "size": 0, "stored_size": 0}
+        for _, meta in self.backend.iter_meta():
+            stats["entries"] += 1
+            stats["stored_size"] += meta["stored_size"]
+            stats["size"] += meta.get("size", meta["stored_size"])
+        stats["saved_bytes"] = stats["size"] - stats["stored_size"]
+        return stats
+
+    def prune(self, max_age: Optional[float] = None, max_bytes: Optional[int] = None) -> Dict[str, int]:
+        """
+        Enforces the expiry and size policy over the whole cache.
+        - Entries fetched more than `max_age` seconds ago are removed.
+        - Then the least recently accessed entries are removed until at most `max_bytes` remain.
+        - Both default to the cache's own settings. Returns removed/kept counts and bytes.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        now = time.time()
+        kept = []
+        result = {"removed": 0, "removed_bytes": 0, "kept": 0, "kept_bytes": 0}
+        for key, meta in self.backend.iter_meta():
+            if max_age and now - meta.get("fetched_at", 0) > max_age:
+                self._remove(key)
+                result["removed"] += 1
+                result["removed_bytes"] += meta["stored_size"]
+            else:
+                kept.append((meta.get("accessed_at", 0), key, meta["stored_size"]))
+        kept.sort()
+        total = sum(size for _, _, size in kept)
+        evicted = 0
+        for _, key, size in kept:
+            if not max_bytes or total <= max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            evicted += 1
+            result["removed_bytes"] += size
+        self.metrics.inc("evictions_total", evicted)
+        result["removed"] += evicted
+        result["kept"] = len(kept) - evicted
+        result["kept_bytes"] = total
+        with self._index.lock:
+            self._index.reset()
+        return result
+
+    def fetch(self, url: str) -> str:
+        """
+        Fetches the URL through ScrapingBee and stores it, bypassing any cached copy.
+        """
+        response = self._request(self._client().fetch, url)
+        html = response.text
+        self.store(url, html, response)
+        return html
+
+    def _request(self, send: Callable[..., requests.Response], url: str, **kwargs: Any) -> requests.Response:
+        with self.metrics.timer("fetch_seconds"):
+            try:
+                response = send(url, **kwargs)
+            except Exception:
+                self.metrics.inc("fetch_errors_total")
+                raise
+        self.metrics.inc("fetches_total")
+        self.metrics.observe("response_bytes", len(response.content))
+        return response
+
+    def revalidate(self, url: str) -> Tuple[str, bool]:
+        """
+        Refreshes the URL's entry with a conditional request and returns (html, changed).
+        - A 304 answer, or a body with the same SHA-256 as the cached one, only renews
+          the entry's fetch time; the page itself is rewritten only when it changed.
+        - Entries that are missing or unreadable are fetched in full.
+        """
+        key = url_to_key(url)
+        meta = self.backend.read_meta(key)
+        cached = self._lookup(url, max_age=0) if meta is not None else None
+        if meta is None or cached is None:
+            return self.fetch(url), True
+        headers = conditional_headers(meta)
+        client = self._client()
+        send = client.fetch_direct if self.revalidate_direct else client.fetch
+        response = self._request(send, url, headers=headers)
+        self.metrics.inc("revalidations_total")
+        if response.status_code != 304:
+            html = response.text
+            digest = meta.get("sha256") or hashlib.sha256(cached.encode("utf-8")).hexdigest()
+            if hashlib.sha256(html.encode("utf-8")).hexdigest() != digest:
+                self.store(url, html, response)
+                return html, True
+        now = time.time()
+        meta.update(response_validators(response.headers))
+        meta["fetched_at"] = now
+        meta["accessed_at"] = now
+        self.backend.write_meta(key, meta)
+        self.memory.put(key, cached, now)
+        self.metrics.inc("revalidations_unchanged_total")
+        return cached, False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache's metrics snapshot together with the memory tier's counters.
+        """
+        snapshot = self.metrics.snapshot()
+        snapshot["memory"] = self.memory.stats()
+        return snapshot
+
+    def refresh(self, max_age: Optional[float] = None, concurrency: int = 8) -> Dict[str, int]:
+        """
+        Revalidates every entry fetched more than `max_age` seconds ago (default: the
+        cache's max_age; 0 = all entries), `concurrency` at a time.
+        Returns counts of changed, unchanged and failed entries.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        urls = [
+            meta["url"] for _, meta in self.backend.iter_meta()
+            if meta.get("url") and (not max_age or now - meta.get("fetched_at", 0) > max_age)
+        ]
+        result = {"changed": 0, "unchanged": 0, "failed": 0}
+        if not urls:
+            return result
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(urls))) as pool:
+            futures = [pool.submit(self.revalidate, url) for url in urls]
+            for future in as_completed(futures):
+                try:
+                    _, changed = future.result()
+                except Exception:
+                    result["failed"] += 1
+                    continue
+                result["changed" if changed else "unchanged"] += 1
+        return result
+
+    def get_html(self, url: str, max_age: Optional[float] = None) -> str:
+        """
+        Returns the HTML content of the given URL, from the cache when possible.
+        - `max_age` overrides the cache's expiry for this URL (seconds, 0 = never expires).
+        """
+        html = self.load(url, max_age)
+        if html is not None:
+            return html
+        return self._fetch_missing(url, max_age)
+
+    def _fetch_missing(self, url: str, max_age: Optional[float]) -> str:
+        key = url_to_key(url)
+
+        def fetch_once() -> str:
+            with self.backend.lock(key):
+                # Another process may have fetched the page while we waited
+                html = self._lookup(url, max_age)
+                if html is not None:
+                    return html
+                if self.revalidate_expired:
+                    return self.revalidate(url)[0]
+                return self.fetch(url)
+
+        html, shared = self._inflight.do(key, fetch_once)
+        if shared:
+            self.metrics.inc("coalesced_total")
+        return html
+
+    def get_html_many(self, urls: Iterable[str], concurrency: int = 8, max_age: Optional[float] = None) -> Iterator[FetchResult]:
+        """
+        Returns the HTML content of many URLs, yielding FetchResult items as they complete.
+        - Cached pages are yielded first, without touching the network.
+        - Only the misses are fetched from ScrapingBee, at most `concurrency` at a time.
+        - A failed fetch is yielded with its exception instead of aborting the batch.
+        - Size the client's pool_size to `concurrency` so every worker keeps its connection alive.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        misses = []
+        seen = set()
+        for url in urls:
+            if url in seen:
+                continue
+            seen.add(url)
+            html = self.load(url, max_age)
+            if html is not None:
+                yield FetchResult(url, html, None, True)
+            else:
+                misses.append(url)
+        if not misses:
+            return
+        self._client().check_credentials()
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(misses))) as pool:
+            futures = {pool.submit(self._fetch_missing, url, max_age): url for url in misses}
+            try:
+                for future in as_completed(futures):
+                    url = futures[future]
+                    try:
+                        yield FetchResult(url, future.result(), None, False)
+                    except Exception as e:
+                        yield FetchResult(url, None, e, False)
+            finally:
+                # Stop queued fetches if the caller stops iterating early
+                for future in futures:
+                    future.cancel()
+
+
+_default_cache: Optional[HTMLCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> HTMLCache:
+    """
+    Returns the shared cache used by get_html, creating it on first use.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTMLCache()
+        return _default_cache
+
+
+def set_default_cache(html_cache: Optional[HTMLCache]) -> None:
+    """
+    Replaces the shared cache (None resets it to a fresh default on next use).
+    """
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = html_cache
+
+
+def _cache_for(client: Optional[ScrapingBeeClient]) -> HTMLCache:
+    if client is None:
+        return get_default_cache()
+    return get_default_cache().with_client(client)
+
+
+def get_html(url: str, client: Optional[ScrapingBeeClient] = None, max_age: Optional[float] = None) -> str:
     """
     Returns the HTML content of the given URL with caching.
     - First, it checks the cache. If present, reads from there.
     - If not, fetches using ScrapingBee, saves to cache.
+    - Fetches go through `client`, or the shared pooled client by default.
+    - Entries older than `max_age` seconds are refetched (default: SCRAPINGBEE_CACHE_MAX_AGE).
     """
-    cache_path = os.path.join(CACHE_DIR, url_to_filename(url))
-    if os.path.exists(cache_path):
-        with open(cache_path, "r", encoding="utf-8") as f:
-            return f.read()
-    api_key = os.getenv("SCRAPINGBEE_KEY")
-    if not api_key:
-        raise RuntimeError("SCRAPINGBEE_KEY not found! Please check your .env file.")
-    response = requests.get(
-        "https://app.scrapingbee.com/api/v1/",
-        params={
-            "api_key": api_key,
-            "url": url,
-            "render_js": "false"
-        },
-        timeout=15
-    )
-    response.raise_for_status()
-    html = response.text
-    with open(cache_path, "w", encoding="utf-8") as f:
-        f.write(html)
-    return html 
\ No newline at end of file
+    return _cache_for(client).get_html(url, max_age)
+
+
+def get_html_many(
+    urls: Iterable[str],
+    concurrency: int = 8,
+    client: Optional[ScrapingBeeClient] = None,
+    max_age: Optional[float] = None,
+) -> Iterator[FetchResult]:
+    """
+    Batch version of get_html; see HTMLCache.get_html_many.
+    """
+    return _cache_for(client).get_html_many(urls, concurrency, max_age)
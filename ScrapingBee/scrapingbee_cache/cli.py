@@ -0,0 +1,102 @@
+"""
+scrapingbee-cache  –  maintenance commands for the HTML cache
+
+Usage examples:
+    scrapingbee-cache prune --max-age 30d --max-bytes 2GB
+    scrapingbee-cache stats --cache-dir cache
+    scrapingbee-cache refresh --max-age 1d --concurrency 16
+    scrapingbee-cache convert --to sqlite
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .backends import BACKENDS, open_backend
+from .cache import HTMLCache
+from .utils import parse_duration, parse_size
+
+
+def _format_bytes(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def _prune(args: argparse.Namespace) -> None:
+    html_cache = HTMLCache(args.cache_dir, backend=args.backend)
+    result = html_cache.prune(
+        max_age=parse_duration(args.max_age) if args.max_age else None,
+        max_bytes=parse_size(args.max_bytes) if args.max_bytes else None,
+    )
+    print(f"Removed : {result['removed']} entries ({_format_bytes(result['removed_bytes'])})")
+    print(f"Kept    : {result['kept']} entries ({_format_bytes(result['kept_bytes'])})")
+
+
+def _stats(args: argparse.Namespace) -> None:
+    stats = HTMLCache(args.cache_dir, backend=args.backend).storage_stats()
+    print(f"Entries     : {stats['entries']}")
+    print(f"Page bytes  : {_format_bytes(stats['size'])}")
+    print(f"Stored bytes: {_format_bytes(stats['stored_size'])}")
+    print(f"Saved       : {_format_bytes(stats['saved_bytes'])}")
+
+
+def _refresh(args: argparse.Namespace) -> None:
+    html_cache = HTMLCache(args.cache_dir, backend=args.backend, revalidate_direct=args.direct or None)
+    result = html_cache.refresh(
+        max_age=parse_duration(args.max_age) if args.max_age else None,
+        concurrency=args.concurrency,
+    )
+    print(f"Changed  : {result['changed']}")
+    print(f"Unchanged: {result['unchanged']}")
+    print(f"Failed   : {result['failed']}")
+
+
+def _convert(args: argparse.Namespace) -> None:
+    html_cache = HTMLCache(args.cache_dir, backend=args.backend)
+    source = html_cache.backend
+    target = open_backend(args.to, html_cache.cache_dir, args.to_path)
+    copied = 0
+    for key, meta in source.iter_meta():
+        blob = source.read(key)
+        if blob is not None:
+            target.write(key, blob, meta)
+            copied += 1
+    target.close()
+    print(f"Copied {copied} entries from {source.name} to {target.name}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(prog="scrapingbee-cache", description="Maintain the scrapingbee_cache HTML cache")
+    p.add_argument("--cache-dir", default=None, help="Cache directory (default: ./cache)")
+    p.add_argument("--backend", choices=BACKENDS, default=None, help="Storage backend (default: SCRAPINGBEE_CACHE_BACKEND or filesystem)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    prune = sub.add_parser("prune", help="Remove expired entries and enforce the size budget")
+    prune.add_argument("--max-age", default=None, help="Maximum entry age, e.g. 3600, 12h, 30d (default: SCRAPINGBEE_CACHE_MAX_AGE)")
+    prune.add_argument("--max-bytes", default=None, help="Total size budget, e.g. 500MB, 2GB (default: SCRAPINGBEE_CACHE_MAX_BYTES)")
+    prune.set_defaults(func=_prune)
+
+    stats = sub.add_parser("stats", help="Show entry count and compression savings")
+    stats.set_defaults(func=_stats)
+
+    refresh = sub.add_parser("refresh", help="Revalidate expired entries with conditional requests")
+    refresh.add_argument("--max-age", default=None, help="Revalidate entries older than this (default: SCRAPINGBEE_CACHE_MAX_AGE, 0 = all)")
+    refresh.add_argument("--concurrency", type=int, default=8, help="Parallel requests (default: 8)")
+    refresh.add_argument("--direct", action="store_true", help="Send conditional requests to the sites directly, bypassing ScrapingBee")
+    refresh.set_defaults(func=_refresh)
+
+    convert = sub.add_parser("convert", help="Copy every entry into another backend")
+    convert.add_argument("--to", choices=BACKENDS, required=True, help="Target backend")
+    convert.add_argument("--to-path", default=None, help="Target store path (default: inside the cache directory)")
+    convert.set_defaults(func=_convert)
+
+    args = p.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main(sys.argv[1:])
@@ -0,0 +1,145 @@
+import os
+import threading
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SCRAPINGBEE_API_URL = os.getenv("SCRAPINGBEE_API_URL", "https://app.scrapingbee.com/api/v1/")
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ScrapingBeeClient:
+    """
+    Reusable ScrapingBee client backed by a pooled requests.Session.
+    - Connections to the API are kept alive and shared between calls (and threads).
+    - 429 and 5xx responses are retried with exponential backoff, honoring Retry-After.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        *,
+        api_url: Optional[str] = None,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: float = 15,
+        render_js: bool = False,
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.timeout = timeout
+        self.render_js = render_js
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _api_key(self) -> str:
+        api_key = self.api_key or os.getenv("SCRAPINGBEE_KEY")
+        if not api_key:
+            raise RuntimeError("SCRAPINGBEE_KEY not found! Please check your .env file.")
+        return api_key
+
+    def check_credentials(self) -> None:
+        """
+        Raises RuntimeError if no API key is configured.
+        """
+        self._api_key()
+
+    def fetch(
+        self,
+        url: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        Fetches the given URL through ScrapingBee and returns the raw response.
+        - Extra ScrapingBee parameters can be passed in `params`.
+        - `headers` are forwarded to the target site (sent as Spb- headers with forward_headers).
+          Such requests also set transparent_status_code, so a target's 304 answer to a
+          conditional request arrives as a 304 instead of a ScrapingBee error.
+        - Raises requests.HTTPError for 4xx/5xx responses once retries are exhausted.
+        """
+        query = {
+            "api_key": self._api_key(),
+            "url": url,
+            "render_js": "true" if self.render_js else "false",
+        }
+        if headers:
+            query["forward_headers"] = "true"
+            query["transparent_status_code"] = "true"
+        if params:
+            query.update(params)
+        response = self.session.get(
+            self.api_url or SCRAPINGBEE_API_URL,
+            params=query,
+            headers={f"Spb-{name}": value for name, value in (headers or {}).items()},
+            timeout=self.timeout if timeout is None else timeout,
+        )
+        response.raise_for_status()
+        return response
+
+    def fetch_direct(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> requests.Response:
+        """
+        Fetches the URL from the target site itself, bypassing ScrapingBee (no credits).
+        Uses the same pooled session, retries and timeout as fetch().
+        """
+        response = self.session.get(url, headers=headers, timeout=self.timeout if timeout is None else timeout)
+        response.raise_for_status()
+        return response
+
+    def get_text(self, url: str) -> str:
+        """
+        Fetches the given URL through ScrapingBee and returns the page body.
+        """
+        return self.fetch(url).text
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "ScrapingBeeClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_default_client: Optional[ScrapingBeeClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> ScrapingBeeClient:
+    """
+    Returns the shared client used by get_html, creating it on first use.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = ScrapingBeeClient()
+        return _default_client
+
+
+def set_default_client(client: Optional[ScrapingBeeClient]) -> None:
+    """
+    Replaces the shared client (None resets it to a fresh default on next use).
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None and _default_client is not client:
+            _default_client.close()
+        _default_client = client
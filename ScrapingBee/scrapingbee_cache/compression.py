@@ -0,0 +1,64 @@
+import gzip
+from typing import Optional
+
+# Optional: zstd support (pip install zstandard)
+try:
+    import zstandard  # type: ignore
+except ImportError:  # zstd is simply unavailable; gzip and raw entries still work
+    zstandard = None
+
+CODECS = ("none", "gzip", "zstd")
+
+# Every compressed entry starts with its format's magic number, which acts as the
+# per-entry header: raw HTML never starts with these bytes, so caches with mixed
+# codecs can be read without knowing how each entry was written.
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def check_codec(codec: str) -> str:
+    """
+    Validates a codec name and returns it.
+    Raises ValueError for unknown codecs and RuntimeError if zstd is not installed.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown cache codec {codec!r}; expected one of {', '.join(CODECS)}")
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("zstd cache compression requires the 'zstandard' package (pip install zstandard).")
+    return codec
+
+
+def detect_codec(blob: bytes) -> str:
+    """
+    Returns the codec an entry was written with, based on its leading bytes.
+    """
+    if blob.startswith(GZIP_MAGIC):
+        return "gzip"
+    if blob.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return "none"
+
+
+def compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    """
+    Compresses data with the given codec ("none" returns it unchanged).
+    """
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6 if level is None else level)
+    if codec == "zstd":
+        check_codec(codec)
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    return data
+
+
+def decompress(blob: bytes) -> bytes:
+    """
+    Decompresses an entry written by compress(), whatever its codec.
+    """
+    codec = detect_codec(blob)
+    if codec == "gzip":
+        return gzip.decompress(blob)
+    if codec == "zstd":
+        check_codec(codec)
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return blob
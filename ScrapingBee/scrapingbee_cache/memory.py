@@ -0,0 +1,82 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU of HTML pages, bounded by bytes rather than entries.
+    - Sizes are the in-memory size of each string, so a few large pages cannot
+      crowd out the budget unnoticed.
+    - Hit, miss and eviction counters are kept for stats().
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Returns (html, fetched_at) for the key, or None if it is not held in memory.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: str, html: str, fetched_at: float) -> None:
+        """
+        Stores a page, evicting the least recently used ones to stay within max_bytes.
+        Pages larger than the whole budget are not kept.
+        """
+        size = sys.getsizeof(html)
+        with self._lock:
+            self._discard(key)
+            if not self.max_bytes or size > self.max_bytes:
+                return
+            self._entries[key] = (html, fetched_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns hit/miss/eviction counters, hit ratio and current usage.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Sequence
+
+# Seconds: from memory-speed lookups up to slow ScrapingBee renders
+TIME_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Bytes: typical pages are 100-500 KB
+SIZE_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 250 * 1024, 500 * 1024, 1024 ** 2, 5 * 1024 ** 2)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus style: bucket counts, sum and count).
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+
+class Metrics:
+    """
+    Thread-safe counters and histograms for one HTMLCache.
+    - snapshot() returns plain dicts; to_json() and to_prometheus() render them.
+    - Histograms ending in "_seconds" use TIME_BUCKETS, "_bytes" use SIZE_BUCKETS.
+    """
+
+    def __init__(self, namespace: str = "scrapingbee_cache"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(SIZE_BUCKETS if name.endswith("_bytes") else TIME_BUCKETS)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Observes the duration of the block, in seconds, into the named histogram.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {name: h.snapshot() for name, h in self.histograms.items()}
+        hits = counters.get("memory_hits_total", 0) + counters.get("disk_hits_total", 0)
+        lookups = hits + counters.get("misses_total", 0)
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self.counters):
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {full} counter")
+                lines.append(f"{full} {self.counters[name]:g}")
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {full} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{full}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{full}_sum {histogram.sum:g}")
+                lines.append(f"{full}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
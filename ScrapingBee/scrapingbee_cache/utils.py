@@ -1,5 +1,100 @@
+import hashlib
+import os
+from typing import Dict, Mapping, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
 def url_to_filename(url: str) -> str:
     """
     Converts a URL into a safe filename.
+    Legacy flat layout; only used to find and migrate old cache entries.
     """
-    return url.replace("://", "_").replace("/", "_") + ".html" 
\ No newline at end of file
+    return url.replace("://", "_").replace("/", "_") + ".html"
+
+
+def normalize_url(url: str) -> str:
+    """
+    Returns a canonical form of the URL so equivalent spellings share one cache entry.
+    - Scheme and host are lowercased, default ports and fragments are dropped.
+    - An empty path becomes "/" and query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"
+    if parts.port and DEFAULT_PORTS.get(scheme) != parts.port:
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def url_to_key(url: str) -> str:
+    """
+    Returns the cache key of a URL: the SHA-256 hex digest of its normalized form.
+    """
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def key_to_relpath(key: str) -> Tuple[str, str]:
+    """
+    Returns the (shard directory, file stem) of a cache key, e.g. ("ab/cd", "abcd...").
+    Two levels of 256 shards keep each directory small even with millions of entries.
+    """
+    return os.path.join(key[:2], key[2:4]), key
+
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4}
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parses a duration such as "3600", "45m", "12h" or "30d" into seconds.
+    """
+    text = value.strip().lower()
+    if text and text[-1] in _DURATION_UNITS:
+        return float(text[:-1]) * _DURATION_UNITS[text[-1]]
+    return float(text)
+
+
+def parse_size(value: str) -> int:
+    """
+    Parses a size such as "1048576", "500MB" or "2GB" into bytes (binary units).
+    """
+    text = value.strip().lower().replace(" ", "")
+    for unit in sorted(_SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit) and text[:-len(unit)]:
+            return int(float(text[:-len(unit)]) * _SIZE_UNITS[unit])
+    return int(text)
+
+
+def response_validators(headers: Mapping[str, str]) -> Dict[str, str]:
+    """
+    Extracts the ETag / Last-Modified validators of a page from response headers.
+    ScrapingBee returns the target's headers with an "Spb-" prefix; direct fetches don't.
+    """
+    lowered = {name.lower(): value for name, value in headers.items()}
+    validators = {}
+    for field, header in (("etag", "etag"), ("last_modified", "last-modified")):
+        value = lowered.get(header) or lowered.get(f"spb-{header}")
+        if value:
+            validators[field] = value
+    return validators
+
+
+def conditional_headers(meta: Mapping[str, str]) -> Dict[str, str]:
+    """
+    Returns If-None-Match / If-Modified-Since headers built from an entry's validators.
+    """
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
@@ -10,5 +10,14 @@ setup(
         "requests",
         "python-dotenv"
     ],
+    entry_points={
+        "console_scripts": [
+            "scrapingbee-cache=scrapingbee_cache.cli:main",
+        ],
+    },
+    extras_require={
+        "zstd": ["zstandard"],
+        "lmdb": ["lmdb"],
+    },
     python_requires=">=3.7",
 ) 
\ No newline at end of file
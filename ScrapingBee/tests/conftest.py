@@ -0,0 +1,73 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scrapingbee_cache import cache, client
+
+
+class StubScrapingBee:
+    """
+    Local stand-in for the ScrapingBee endpoint.
+    - Answers every request with a small HTML page naming the target URL.
+    - `responses` maps a target URL to a list of (status, body, headers) served first.
+    - With `opaque_status`, non-2xx target statuses turn into a 500 unless the request sets
+      transparent_status_code=true, as the real API does.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.responses = {}
+        self.delay = 0.0
+        self.opaque_status = False
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                target = query.get("url", [""])[0]
+                with stub._lock:
+                    stub.requests.append({"url": target, "headers": dict(self.headers), "params": query})
+                    queued = stub.responses.get(target)
+                    status, body, headers = queued.pop(0) if queued else (200, f"<html><body>{target}</body></html>", {})
+                transparent = query.get("transparent_status_code", [""])[0] == "true"
+                if stub.opaque_status and not 200 <= status < 300 and not transparent:
+                    status, body, headers = 500, "", {}
+                if stub.delay:
+                    threading.Event().wait(stub.delay)
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def scrapingbee_stub(tmp_path, monkeypatch):
+    stub = StubScrapingBee()
+    monkeypatch.setenv("SCRAPINGBEE_KEY", "test-key")
+    monkeypatch.setattr(client, "SCRAPINGBEE_API_URL", stub.url)
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    client.set_default_client(None)
+    cache.set_default_cache(None)
+    yield stub
+    client.set_default_client(None)
+    cache.set_default_cache(None)
+    stub.close()
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from scrapingbee_cache import HTMLCache
+from scrapingbee_cache.backends import FilesystemBackend, LMDBBackend, SQLiteBackend, lmdb
+from scrapingbee_cache.cli import main
+
+BACKENDS = [
+    FilesystemBackend,
+    SQLiteBackend,
+    pytest.param(LMDBBackend, marks=pytest.mark.skipif(lmdb is None, reason="lmdb not installed")),
+]
+
+
+def _open(backend_cls, tmp_path):
+    if backend_cls is FilesystemBackend:
+        return backend_cls(str(tmp_path / "fs"))
+    return backend_cls(str(tmp_path / "store"))
+
+
+@pytest.mark.parametrize("backend_cls", BACKENDS)
+def test_backend_round_trip(backend_cls, tmp_path):
+    backend = _open(backend_cls, tmp_path)
+    backend.write("ab" * 32, b"blob", {"url": "https://example.com/", "accessed_at": 1.0})
+    assert backend.read("ab" * 32) == b"blob"
+    backend.write_meta("ab" * 32, {"url": "https://example.com/", "accessed_at": 2.0})
+    assert backend.read_meta("ab" * 32)["accessed_at"] == 2.0
+    assert [key for key, _ in backend.iter_meta()] == ["ab" * 32]
+    backend.delete("ab" * 32)
+    assert backend.read("ab" * 32) is None and backend.read_meta("ab" * 32) is None
+    backend.close()
+
+
+@pytest.mark.parametrize("backend_cls", BACKENDS)
+def test_cache_policies_work_on_every_backend(backend_cls, tmp_path):
+    page = "<html>" + "x" * 1000 + "</html>"
+    html_cache = HTMLCache(str(tmp_path), backend=_open(backend_cls, tmp_path), codec="gzip", memory_bytes=0)
+    html_cache.store("https://example.com/old", page, fetched_at=time.time() - 7200)
+    html_cache.store("https://example.com/new", page)
+    assert html_cache.load("https://example.com/new") == page
+    assert html_cache.load("https://example.com/old", max_age=3600) is None
+    assert html_cache.prune(max_age=3600)["removed"] == 1
+    assert html_cache.storage_stats()["entries"] == 1
+
+
+def test_backend_selected_by_name_and_converted(tmp_path, capsys):
+    html_cache = HTMLCache(str(tmp_path))
+    html_cache.store("https://example.com/", "<html>fs</html>")
+    main(["--cache-dir", str(tmp_path), "convert", "--to", "sqlite"])
+    assert "Copied 1 entries" in capsys.readouterr().out
+    sqlite_cache = HTMLCache(str(tmp_path), backend="sqlite", memory_bytes=0)
+    assert isinstance(sqlite_cache.backend, SQLiteBackend)
+    assert sqlite_cache.load("https://example.com/") == "<html>fs</html>"
+    with pytest.raises(TypeError):
+        sqlite_cache.paths("https://example.com/")
@@ -0,0 +1,46 @@
+import threading
+
+from scrapingbee_cache import get_html, get_html_many
+
+
+def test_get_html_many_fetches_only_misses(scrapingbee_stub):
+    get_html("https://example.com/cached")
+    urls = [f"https://example.com/page/{i}" for i in range(5)] + ["https://example.com/cached"]
+    results = {r.url: r for r in get_html_many(urls, concurrency=3)}
+    assert set(results) == set(urls)
+    assert results["https://example.com/cached"].from_cache
+    assert all(r.error is None for r in results.values())
+    fetched = [r["url"] for r in scrapingbee_stub.requests]
+    assert fetched.count("https://example.com/cached") == 1
+    assert len(fetched) == 6
+
+
+def test_get_html_many_respects_concurrency(scrapingbee_stub):
+    scrapingbee_stub.delay = 0.05
+    active = []
+    peak = []
+    lock = threading.Lock()
+    original = scrapingbee_stub.server.RequestHandlerClass.do_GET
+
+    def counting_get(handler):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        try:
+            original(handler)
+        finally:
+            with lock:
+                active.pop()
+
+    scrapingbee_stub.server.RequestHandlerClass.do_GET = counting_get
+    urls = [f"https://example.com/slow/{i}" for i in range(8)]
+    assert len(list(get_html_many(urls, concurrency=2))) == 8
+    assert max(peak) <= 2
+
+
+def test_get_html_many_reports_errors(scrapingbee_stub):
+    scrapingbee_stub.responses["https://example.com/broken"] = [(404, "missing", {})]
+    results = {r.url: r for r in get_html_many(["https://example.com/broken", "https://example.com/ok"])}
+    assert results["https://example.com/broken"].html is None
+    assert results["https://example.com/broken"].error is not None
+    assert "example.com/ok" in results["https://example.com/ok"].html
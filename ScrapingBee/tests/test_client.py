@@ -0,0 +1,27 @@
+import pytest
+import requests
+
+from scrapingbee_cache import ScrapingBeeClient, get_html
+
+
+def test_client_retries_rate_limited_requests(scrapingbee_stub):
+    scrapingbee_stub.responses["https://example.com/busy"] = [
+        (429, "slow down", {"Retry-After": "0"}),
+        (503, "unavailable", {}),
+    ]
+    with ScrapingBeeClient(api_url=scrapingbee_stub.url, backoff_factor=0) as client:
+        assert "example.com/busy" in client.get_text("https://example.com/busy")
+    assert len(scrapingbee_stub.requests) == 3
+
+
+def test_client_raises_after_retries_exhausted(scrapingbee_stub):
+    scrapingbee_stub.responses["https://example.com/down"] = [(500, "error", {})] * 3
+    with ScrapingBeeClient(api_url=scrapingbee_stub.url, max_retries=2, backoff_factor=0) as client:
+        with pytest.raises(requests.HTTPError):
+            client.get_text("https://example.com/down")
+
+
+def test_get_html_uses_given_client(scrapingbee_stub, monkeypatch):
+    monkeypatch.delenv("SCRAPINGBEE_KEY")
+    client = ScrapingBeeClient(api_key="explicit-key", api_url=scrapingbee_stub.url)
+    assert "example.com/explicit" in get_html("https://example.com/explicit", client=client)
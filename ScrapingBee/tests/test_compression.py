@@ -0,0 +1,37 @@
+import pytest
+
+from scrapingbee_cache import HTMLCache
+from scrapingbee_cache.compression import compress, decompress, detect_codec, zstandard
+
+PAGE = "<html><body>" + "<p>Kapadokya balon turu ve peri bacaları.</p>" * 500 + "</body></html>"
+
+
+def test_gzip_round_trip_and_detection():
+    blob = compress(PAGE.encode("utf-8"), "gzip")
+    assert detect_codec(blob) == "gzip"
+    assert decompress(blob).decode("utf-8") == PAGE
+    assert detect_codec(PAGE.encode("utf-8")) == "none"
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_zstd_round_trip():
+    blob = compress(PAGE.encode("utf-8"), "zstd")
+    assert detect_codec(blob) == "zstd"
+    assert decompress(blob).decode("utf-8") == PAGE
+
+
+def test_mixed_codecs_in_one_cache(tmp_path):
+    HTMLCache(str(tmp_path), codec="none").store("https://example.com/raw", PAGE)
+    HTMLCache(str(tmp_path), codec="gzip").store("https://example.com/gz", PAGE)
+    reader = HTMLCache(str(tmp_path), codec="none")
+    assert reader.load("https://example.com/raw") == PAGE
+    assert reader.load("https://example.com/gz") == PAGE
+    stats = reader.storage_stats()
+    assert stats["entries"] == 2
+    assert stats["size"] == 2 * len(PAGE.encode("utf-8"))
+    assert stats["saved_bytes"] > 0
+
+
+def test_unknown_codec_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        HTMLCache(str(tmp_path), codec="brotli")
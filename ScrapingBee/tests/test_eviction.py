@@ -0,0 +1,40 @@
+import os
+import time
+
+from scrapingbee_cache import HTMLCache, get_html
+from scrapingbee_cache.cli import main
+
+PAGE = "<html>" + "x" * 1000 + "</html>"
+
+
+def test_expired_entries_are_refetched(scrapingbee_stub):
+    url = "https://example.com/stale"
+    get_html(url)
+    assert get_html(url, max_age=3600)
+    assert len(scrapingbee_stub.requests) == 1
+    time.sleep(0.01)
+    get_html(url, max_age=0.001)
+    assert len(scrapingbee_stub.requests) == 2
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    html_cache = HTMLCache(str(tmp_path), max_bytes=3 * len(PAGE))
+    for i in range(3):
+        html_cache.store(f"https://example.com/{i}", PAGE)
+    html_cache.load("https://example.com/0")
+    html_cache.store("https://example.com/3", PAGE)
+    assert html_cache.load("https://example.com/0") == PAGE
+    assert html_cache.load("https://example.com/1") is None
+    assert html_cache.storage_stats()["entries"] == 3
+
+
+def test_prune_command_enforces_policy(tmp_path, capsys):
+    html_cache = HTMLCache(str(tmp_path))
+    html_cache.store("https://example.com/old", PAGE, fetched_at=time.time() - 7200)
+    for i in range(3):
+        html_cache.store(f"https://example.com/{i}", PAGE)
+    main(["--cache-dir", str(tmp_path), "prune", "--max-age", "1h", "--max-bytes", str(2 * len(PAGE))])
+    assert "Removed : 2 entries" in capsys.readouterr().out
+    remaining = [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".html")]
+    assert len(remaining) == 2
+    assert HTMLCache(str(tmp_path), memory_bytes=0).load("https://example.com/old", max_age=0) is None
@@ -0,0 +1,38 @@
+import json
+import os
+
+from scrapingbee_cache import HTMLCache, get_html, normalize_url, url_to_key
+from scrapingbee_cache.utils import url_to_filename
+
+
+def test_normalize_url_merges_equivalent_spellings():
+    assert normalize_url("HTTPS://Example.com:443?b=2&a=1#top") == "https://example.com/?a=1&b=2"
+    assert normalize_url("http://example.com:8080/x") == "http://example.com:8080/x"
+
+
+def test_keys_do_not_collide_on_legacy_ambiguities():
+    assert url_to_filename("https://a/b_c") == url_to_filename("https://a_b/c")
+    assert url_to_key("https://a/b_c") != url_to_key("https://a_b/c")
+
+
+def test_entries_are_sharded_with_metadata(scrapingbee_stub, tmp_path):
+    url = "https://example.com/guide?page=" + "x" * 400
+    get_html(url)
+    html_path, meta_path = HTMLCache(str(tmp_path)).paths(url)
+    key = url_to_key(url)
+    assert html_path == os.path.join(str(tmp_path), key[:2], key[2:4], key + ".html")
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["url"] == url
+    assert meta["status"] == 200
+    assert meta["headers"]["Content-Type"].startswith("text/html")
+
+
+def test_legacy_entries_are_migrated_on_read(scrapingbee_stub, tmp_path):
+    url = "https://example.com/old"
+    legacy_path = tmp_path / url_to_filename(url)
+    legacy_path.write_text("<html>legacy</html>", encoding="utf-8")
+    assert get_html(url) == "<html>legacy</html>"
+    assert not legacy_path.exists()
+    assert os.path.exists(HTMLCache(str(tmp_path)).paths(url)[0])
+    assert scrapingbee_stub.requests == []
@@ -0,0 +1,30 @@
+import sys
+
+from scrapingbee_cache import HTMLCache
+from scrapingbee_cache.memory import MemoryCache
+
+
+def test_memory_cache_is_bounded_by_bytes():
+    page = "x" * 1000
+    memory = MemoryCache(max_bytes=2 * sys.getsizeof(page) + 10)
+    for i in range(3):
+        memory.put(str(i), page, 0.0)
+    assert memory.get("0") is None
+    assert memory.get("2") == (page, 0.0)
+    stats = memory.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_repeated_reads_are_served_from_memory(tmp_path):
+    writer = HTMLCache(str(tmp_path))
+    writer.store("https://example.com/", "<html>hello</html>")
+    reader = HTMLCache(str(tmp_path))
+    assert reader.load("https://example.com/") == "<html>hello</html>"
+    html_path, _ = reader.paths("https://example.com/")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write("<html>changed on disk</html>")
+    assert reader.load("https://example.com/") == "<html>hello</html>"
+    assert reader.memory.stats()["hits"] == 1
+    assert HTMLCache(str(tmp_path), memory_bytes=0).load("https://example.com/") == "<html>changed on disk</html>"
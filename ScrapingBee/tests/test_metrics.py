@@ -0,0 +1,29 @@
+import json
+
+from scrapingbee_cache import HTMLCache, ScrapingBeeClient
+
+
+def test_cache_records_hits_misses_and_timings(scrapingbee_stub, tmp_path):
+    html_cache = HTMLCache(str(tmp_path), client=ScrapingBeeClient(api_url=scrapingbee_stub.url))
+    html_cache.get_html("https://example.com/a")
+    html_cache.get_html("https://example.com/a")
+    HTMLCache(str(tmp_path), memory_bytes=0).get_html("https://example.com/a")
+    stats = html_cache.stats()
+    assert stats["counters"]["misses_total"] == 1
+    assert stats["counters"]["fetches_total"] == 1
+    assert stats["counters"]["memory_hits_total"] == 1
+    assert stats["histograms"]["fetch_seconds"]["count"] == 1
+    assert stats["histograms"]["response_bytes"]["sum"] > 0
+    assert stats["hit_ratio"] == 0.5
+    assert json.loads(html_cache.metrics.to_json())["counters"]["fetches_total"] == 1
+
+
+def test_fetch_errors_and_prometheus_output(scrapingbee_stub, tmp_path):
+    scrapingbee_stub.responses["https://example.com/gone"] = [(404, "missing", {})]
+    html_cache = HTMLCache(str(tmp_path), client=ScrapingBeeClient(api_url=scrapingbee_stub.url))
+    results = list(html_cache.get_html_many(["https://example.com/gone"]))
+    assert results[0].error is not None
+    text = html_cache.metrics.to_prometheus()
+    assert "scrapingbee_cache_fetch_errors_total 1" in text
+    assert 'scrapingbee_cache_lookup_seconds_bucket{le="+Inf"} 1' in text
+    assert "# TYPE scrapingbee_cache_fetch_seconds histogram" in text
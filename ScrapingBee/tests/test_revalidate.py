@@ -0,0 +1,61 @@
+import os
+import time
+
+from scrapingbee_cache import HTMLCache, ScrapingBeeClient
+
+
+def _cache(stub, tmp_path, **kwargs):
+    return HTMLCache(str(tmp_path), client=ScrapingBeeClient(api_url=stub.url), **kwargs)
+
+
+def test_validators_are_stored_and_sent(scrapingbee_stub, tmp_path):
+    url = "https://example.com/guide"
+    scrapingbee_stub.responses[url] = [
+        (200, "<html>v1</html>", {"Spb-ETag": '"abc"', "Spb-Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        (304, "", {}),
+    ]
+    html_cache = _cache(scrapingbee_stub, tmp_path)
+    html_cache.get_html(url)
+    meta = html_cache.load_meta(url)
+    assert meta["etag"] == '"abc"'
+    html_path, _ = html_cache.paths(url)
+    mtime = os.path.getmtime(html_path)
+    html, changed = html_cache.revalidate(url)
+    assert (html, changed) == ("<html>v1</html>", False)
+    assert scrapingbee_stub.requests[-1]["headers"]["Spb-If-None-Match"] == '"abc"'
+    assert os.path.getmtime(html_path) == mtime
+    assert html_cache.load_meta(url)["fetched_at"] > meta["fetched_at"]
+
+
+def test_conditional_requests_ask_for_the_target_status(scrapingbee_stub, tmp_path):
+    url = "https://example.com/opaque"
+    scrapingbee_stub.opaque_status = True
+    scrapingbee_stub.responses[url] = [(200, "<html>v1</html>", {"Spb-ETag": '"v1"'}), (304, "", {})]
+    html_cache = HTMLCache(str(tmp_path), client=ScrapingBeeClient(api_url=scrapingbee_stub.url, max_retries=0))
+    html_cache.get_html(url)
+    assert html_cache.revalidate(url) == ("<html>v1</html>", False)
+    assert scrapingbee_stub.requests[-1]["params"]["transparent_status_code"] == ["true"]
+    assert "transparent_status_code" not in scrapingbee_stub.requests[0]["params"]
+
+
+def test_unchanged_body_is_not_rewritten(scrapingbee_stub, tmp_path):
+    url = "https://example.com/same"
+    html_cache = _cache(scrapingbee_stub, tmp_path)
+    html_cache.get_html(url)
+    html_path, _ = html_cache.paths(url)
+    mtime = os.path.getmtime(html_path)
+    time.sleep(0.01)
+    assert html_cache.revalidate(url)[1] is False
+    assert os.path.getmtime(html_path) == mtime
+    scrapingbee_stub.responses[url] = [(200, "<html>new</html>", {})]
+    assert html_cache.revalidate(url) == ("<html>new</html>", True)
+
+
+def test_expired_entries_are_revalidated(scrapingbee_stub, tmp_path):
+    url = "https://example.com/expiring"
+    html_cache = _cache(scrapingbee_stub, tmp_path, max_age=3600, revalidate=True)
+    html_cache.store(url, "<html>old</html>", fetched_at=time.time() - 7200)
+    scrapingbee_stub.responses[url] = [(304, "", {})]
+    assert html_cache.get_html(url) == "<html>old</html>"
+    result = html_cache.refresh(max_age=0)
+    assert result == {"changed": 1, "unchanged": 0, "failed": 0}
@@ -0,0 +1,31 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from scrapingbee_cache import HTMLCache, ScrapingBeeClient
+
+
+def test_concurrent_misses_share_one_fetch(scrapingbee_stub, tmp_path):
+    scrapingbee_stub.delay = 0.2
+    html_cache = HTMLCache(str(tmp_path), client=ScrapingBeeClient(api_url=scrapingbee_stub.url))
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        pages = list(pool.map(html_cache.get_html, ["https://example.com/hot"] * 6))
+    assert len(set(pages)) == 1
+    assert len(scrapingbee_stub.requests) == 1
+
+
+def test_separate_caches_on_one_directory_share_one_fetch(scrapingbee_stub, tmp_path):
+    # Independent HTMLCache objects stand in for separate worker processes
+    scrapingbee_stub.delay = 0.2
+    client = ScrapingBeeClient(api_url=scrapingbee_stub.url)
+    workers = [HTMLCache(str(tmp_path), client=client, memory_bytes=0) for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pages = list(pool.map(lambda c: c.get_html("https://example.com/shared"), workers))
+    assert len(set(pages)) == 1
+    assert len(scrapingbee_stub.requests) == 1
+
+
+def test_writes_leave_no_temporary_files(tmp_path):
+    html_cache = HTMLCache(str(tmp_path))
+    html_cache.store("https://example.com/", "<html></html>")
+    names = [name for _, _, files in os.walk(tmp_path) for name in files]
+    assert not [name for name in names if name.startswith(".tmp-")]
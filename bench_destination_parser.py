@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+bench_destination_parser.py  –  parse_destinations karşılaştırması
+
+Çok başlıklı sentetik bir rehber sayfası üretir; BeautifulSoup tabanlı eski
+uygulama (parse_destinations_soup) ile tek geçişli lxml uygulamasını
+(parse_destinations) aynı girdide ölçer ve çıktıların aynı olduğunu doğrular.
+
+Kullanım örneği:
+    python bench_destination_parser.py --headings 100 300 1000 --repeat 3
+    python bench_destination_parser.py --file cache_page.html
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+from destination_parser import etree, parse_destinations, parse_destinations_soup
+
+
+def build_page(headings: int, paragraphs: int = 3) -> str:
+    """Her başlığın ardından birkaç paragraf ve gürültü içeren sentetik sayfa."""
+    parts = ["<html><head><title>Rehber</title></head><body><main>"]
+    for i in range(headings):
+        tag = "h2" if i % 4 == 0 else "h3"
+        parts.append(f"<{tag}>{i + 1}. Destinasyon <span>#{i}</span></{tag}>")
+        for j in range(paragraphs):
+            parts.append(f"<p>Destinasyon {i} için paragraf {j}: tarihi sokaklar, <b>müzeler</b> ve plajlar.</p>")
+        parts.append('<div class="ad"><p>Reklam</p><img src="x.png"></div>')
+    parts.append("</main></body></html>")
+    return "".join(parts)
+
+
+def measure(fn: Callable[[str], List[dict]], html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _cli() -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description="parse_destinations performans karşılaştırması")
+    p.add_argument("--headings", type=int, nargs="+", default=[100, 300, 1000], help="Sayfadaki başlık sayıları")
+    p.add_argument("--repeat", type=int, default=3, help="Her ölçümün tekrar sayısı (en iyisi alınır)")
+    p.add_argument("--file", default=None, help="Sentetik sayfa yerine gerçek bir HTML dosyası ölç")
+    args = p.parse_args()
+
+    if etree is None:
+        print("Uyarı: lxml yüklü değil; parse_destinations BeautifulSoup uygulamasına düşüyor.")
+
+    pages = []
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            pages.append((args.file, f.read()))
+    else:
+        pages = [(f"{n} başlık", build_page(n)) for n in args.headings]
+
+    print(f"{'Sayfa':<20}{'Boyut':>10}{'soup (s)':>12}{'lxml (s)':>12}{'Hızlanma':>10}  Aynı çıktı")
+    for name, html in pages:
+        same = parse_destinations(html) == parse_destinations_soup(html)
+        soup_time = measure(parse_destinations_soup, html, args.repeat)
+        lxml_time = measure(parse_destinations, html, args.repeat)
+        print(f"{name:<20}{len(html) // 1024:>8}KB{soup_time:>12.4f}{lxml_time:>12.4f}{soup_time / lxml_time:>9.1f}x  {'evet' if same else 'HAYIR'}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _cli()
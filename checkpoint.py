@@ -0,0 +1,155 @@
+"""
+Kontrol noktası günlüğü (checkpoint log)
+Uzun süren aşamaların (etiketleme, coğrafi kodlama) ilerlemesini, her kayıt
+bittiğinde tek satır ekleyerek saklar; süreç çökerse yeniden başlatıldığında
+tamamlanmış kayıtlar atlanır.
+
+• Dosya yalnızca eklenerek büyür (JSONL): kayıt başına yazma maliyeti O(1)
+• Yarım kalmış son satır (yazarken çökme) okunurken yok sayılır; sonraki ekleme yeni satırdan başlar
+• compact() aynı kaydın eski satırlarını atarak dosyayı atomik olarak yeniden yazar
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+def record_id(item: Dict[str, Any], fields: Iterable[str] = ("title", "content")) -> str:
+    """
+    Stable id of a record: its "id" field if present, otherwise a hash of `fields`.
+    """
+    if item.get("id") is not None:
+        return str(item["id"])
+    payload = json.dumps([item.get(field) for field in fields], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointLog:
+    """
+    Append-only JSONL log of {"id", "stage", "data"} lines, keyed by record id and stage.
+    - append() writes and flushes one line; `fsync=True` also survives power loss.
+    - completed(stage) returns the latest data of every record finished in that stage;
+      latest() the most recent data of every record across all stages.
+    - Safe to share between threads of one process.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self._lines = 0
+        # (stage, record id) -> data, ordered by last write
+        self._entries: Dict[Tuple[str, str], Any] = {}
+        for rid, stage, data in self._read():
+            self._set(rid, stage, data)
+        # Mostly superseded lines: shrink the file once at startup
+        if self._lines > 2 * len(self) + 1024:
+            self.compact()
+
+    def _read(self) -> Iterator[Tuple[str, str, Any]]:
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # yarım yazılmış satır
+                yield entry["id"], entry["stage"], entry.get("data")
+
+    def _set(self, rid: str, stage: str, data: Any) -> None:
+        self._entries.pop((stage, rid), None)
+        self._entries[(stage, rid)] = data
+        self._lines += 1
+
+    def append(self, rid: str, stage: str, data: Any = None) -> None:
+        line = json.dumps({"id": rid, "stage": stage, "data": data}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+                if self._torn_tail():
+                    self._file.write("\n")  # yarım satırı kapat, yeni kayıt ona karışmasın
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._set(rid, stage, data)
+
+    def _torn_tail(self) -> bool:
+        """True when the file is non-empty and does not end with a newline (crash mid-write)."""
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def completed(self, stage: str) -> Dict[str, Any]:
+        with self._lock:
+            return {rid: data for (entry_stage, rid), data in self._entries.items() if entry_stage == stage}
+
+    def latest(self) -> Dict[str, Any]:
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for (_, rid), data in self._entries.items():
+                result.pop(rid, None)
+                result[rid] = data
+            return result
+
+    def is_done(self, rid: str, stage: str) -> bool:
+        with self._lock:
+            return (stage, rid) in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def compact(self) -> None:
+        """
+        Rewrites the log with only the latest line of every (stage, id).
+        """
+        with self._lock:
+            self._close()
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for (stage, rid), data in self._entries.items():
+                    f.write(json.dumps({"id": rid, "stage": stage, "data": data}, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+            self._lines = len(self._entries)
+
+    def clear(self, stage: Optional[str] = None) -> None:
+        """
+        Forgets one stage (rewriting the log without it) or, by default, deletes the log.
+        """
+        if stage is not None:
+            with self._lock:
+                self._entries = {key: data for key, data in self._entries.items() if key[0] != stage}
+            self.compact()
+            return
+        with self._lock:
+            self._close()
+            self._entries.clear()
+            self._lines = 0
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
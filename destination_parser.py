@@ -0,0 +1,283 @@
+"""
+Destinasyon çıkarıcı
+HTML içindeki h2/h3 başlıklarını ve onları izleyen <p> paragraflarını
+{'title': ..., 'content': ...} kayıtlarına dönüştürür.
+
+• lxml kuruluysa tek geçişte, akış halinde (HTMLPullParser) çalışır
+• lxml yoksa BeautifulSoup tabanlı eski uygulamaya düşer
+• Site/URL bazlı bildirimsel kurallar (extraction_rules.json) ile liste, kart ve
+  iç içe <div> düzenindeki rehberler CSS/XPath seçicileriyle çıkarılır
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+# ------------------------------------------------------------
+# Opsiyonel: lxml (+ CSS seçiciler için cssselect)
+try:
+    from lxml import etree, html as lxml_html  # type: ignore
+except ImportError:  # kitaplık yoksa BeautifulSoup uygulaması kullanılır
+    etree = None
+    lxml_html = None
+try:
+    from lxml.cssselect import CSSSelector  # type: ignore
+except ImportError:  # CSS kuralları kullanılamaz; XPath kuralları çalışır
+    CSSSelector = None
+
+RULES_PATH = os.getenv("EXTRACTION_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "extraction_rules.json"))
+
+HEADINGS = ("h2", "h3")
+# get_text() ile aynı davranış: bu etiketlerin metni içeriğe dahil edilmez
+SKIP_TEXT = ("script", "style", "template")
+CHUNK_SIZE = 64 * 1024
+# lxml refuses str input that carries an encoding declaration (<?xml ... encoding="..."?>)
+_XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def parse_destinations_soup(html: str) -> List[Dict[str, str]]:
+    """
+    Extracts destination titles (h2 or h3) and their paragraph texts from HTML,
+    returns as [{'title': ..., 'content': ...}, ...].
+    Reference BeautifulSoup implementation; walks the following siblings of every
+    heading, so it is quadratic in the number of headings on large pages.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    data = []
+    for header in soup.find_all(["h2", "h3"]):
+        title = header.get_text(strip=True)
+        paragraphs = []
+        for sib in header.find_next_siblings():
+            if sib.name in ["h2", "h3"]:
+                break
+            if sib.name == "p":
+                text = sib.get_text(strip=True)
+                if text:
+                    paragraphs.append(text)
+        if paragraphs:
+            data.append({
+                "title": title,
+                "content": " ".join(paragraphs)
+            })
+    return data
+
+
+def element_text(element) -> str:
+    """
+    Same result as BeautifulSoup's get_text(strip=True): every text node stripped
+    and joined, skipping comments and script/style contents.
+    """
+    parts: List[str] = []
+
+    def walk(node) -> None:
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in SKIP_TEXT:
+                walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(element)
+    return "".join(part.strip() for part in parts)
+
+
+class _Section:
+    __slots__ = ("title", "paragraphs", "done")
+
+    def __init__(self, title: str):
+        self.title = title
+        self.paragraphs: List[str] = []
+        self.done = False
+
+
+def iter_destinations(html: Union[str, Iterable[str]]) -> Iterator[Dict[str, str]]:
+    """
+    Yields {'title': ..., 'content': ...} records in document order as soon as each
+    section is complete (at the next sibling heading or when its parent closes).
+    - Accepts the whole HTML string or an iterable of chunks (e.g. a streamed file).
+    - Single pass over the document; finished subtrees are freed as parsing goes on.
+    """
+    if etree is None:
+        text = html if isinstance(html, str) else "".join(html)
+        yield from parse_destinations_soup(text)
+        return
+    if isinstance(html, str):
+        chunks: Iterable[str] = [html[i:i + CHUNK_SIZE] for i in range(0, len(html), CHUNK_SIZE)]
+    else:
+        chunks = html
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    pending: Deque[_Section] = deque()
+    # parent element -> section collecting that parent's following <p> children
+    active: Dict[object, _Section] = {}
+    # Number of open <p>/<h2>/<h3> elements whose text is still to be extracted
+    open_text = 0
+
+    def handle(event: str, element) -> None:
+        nonlocal open_text
+        tag = element.tag
+        if not isinstance(tag, str):
+            return
+        if event == "start":
+            if tag == "p" or tag in HEADINGS:
+                open_text += 1
+            return
+        parent = element.getparent()
+        if tag in HEADINGS:
+            previous = active.get(parent)
+            if previous is not None:
+                previous.done = True
+            section = _Section(element_text(element))
+            pending.append(section)
+            active[parent] = section
+        elif tag == "p":
+            section = active.get(parent)
+            if section is not None:
+                text = element_text(element)
+                if text:
+                    section.paragraphs.append(text)
+        if tag == "p" or tag in HEADINGS:
+            open_text -= 1
+        closed = active.pop(element, None)
+        if closed is not None:
+            closed.done = True
+        if open_text:
+            return  # still part of a paragraph/heading whose text is needed
+        # The subtree is fully handled: drop it and its handled siblings to keep memory flat
+        element.clear(keep_tail=True)
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+    def ready() -> Iterator[Dict[str, str]]:
+        while pending and pending[0].done:
+            section = pending.popleft()
+            if section.paragraphs:
+                yield {"title": section.title, "content": " ".join(section.paragraphs)}
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            handle(event, element)
+        yield from ready()
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        return  # boş / yalnızca boşluk içeren belge: kayıt yok (BeautifulSoup gibi)
+    for event, element in parser.read_events():
+        handle(event, element)
+    for section in pending:
+        section.done = True
+    yield from ready()
+
+
+# ------------------------- Kural motoru ------------------------------ #
+class ExtractionRule:
+    """
+    One declarative extraction rule, with its selectors compiled once.
+    - `domains`: host names the rule applies to ("*.example.com" also matches subdomains).
+    - `url_pattern`: optional regex the full URL must match.
+    - `record`: selector for each destination container (card, list item, section).
+    - `title` / `content`: selectors relative to the record; all content matches are joined.
+    - `type`: "css" (default) or "xpath".
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name: str = spec.get("name", "")
+        self.domains: Tuple[str, ...] = tuple(d.lower() for d in spec.get("domains", []))
+        self.url_pattern = re.compile(spec["url_pattern"]) if spec.get("url_pattern") else None
+        selector_type = spec.get("type", "css")
+        if selector_type not in ("css", "xpath"):
+            raise ValueError(f"Kural '{self.name}': bilinmeyen seçici tipi {selector_type!r}")
+        if etree is None:
+            raise RuntimeError("Çıkarma kuralları için lxml gerekli (pip install lxml).")
+        if selector_type == "css" and CSSSelector is None:
+            raise RuntimeError("CSS kuralları için cssselect gerekli (pip install cssselect).")
+        compile_selector = CSSSelector if selector_type == "css" else etree.XPath
+        try:
+            self.record = compile_selector(spec["record"])
+            self.title = compile_selector(spec["title"])
+            self.content = compile_selector(spec["content"])
+        except KeyError as e:
+            raise ValueError(f"Kural '{self.name}': eksik alan {e}") from None
+
+    def matches(self, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if self.domains and not any(
+            host == d or (d.startswith("*.") and (host == d[2:] or host.endswith(d[1:])))
+            for d in self.domains
+        ):
+            return False
+        if self.url_pattern and not self.url_pattern.search(url):
+            return False
+        return bool(self.domains or self.url_pattern)
+
+    def extract(self, html: str) -> List[Dict[str, str]]:
+        html = _XML_DECLARATION.sub("", html, count=1)
+        if not html.strip():
+            return []
+        try:
+            root = lxml_html.fromstring(html)
+        except etree.ParserError:
+            return []  # yalnızca yorum vb. içeren belge
+        data = []
+        for record in self.record(root):
+            titles = [element_text(el) if not isinstance(el, str) else el.strip() for el in self.title(record)]
+            title = next((t for t in titles if t), "")
+            paragraphs = [element_text(el) if not isinstance(el, str) else el.strip() for el in self.content(record)]
+            paragraphs = [p for p in paragraphs if p]
+            if title and paragraphs:
+                data.append({"title": title, "content": " ".join(paragraphs)})
+        return data
+
+
+@lru_cache(maxsize=8)
+def _compile_rules(path: str, mtime: float) -> Tuple[ExtractionRule, ...]:
+    with open(path, "r", encoding="utf-8") as f:
+        specs = json.load(f).get("rules", [])
+    return tuple(ExtractionRule(spec) for spec in specs)
+
+
+def load_rules(path: Optional[str] = None) -> Sequence[ExtractionRule]:
+    """
+    Loads and compiles the rule file (default: extraction_rules.json next to this module).
+    Compiled rules are cached and only rebuilt when the file changes.
+    """
+    path = path or RULES_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ()
+    return _compile_rules(path, mtime)
+
+
+def select_rule(url: Optional[str], rules: Optional[Sequence[ExtractionRule]] = None) -> Optional[ExtractionRule]:
+    """
+    Returns the first rule matching the URL, or None (heading-based extraction applies).
+    """
+    if not url:
+        return None
+    for rule in load_rules() if rules is None else rules:
+        if rule.matches(url):
+            return rule
+    return None
+
+
+def parse_destinations(html: str, url: Optional[str] = None, rules: Optional[Sequence[ExtractionRule]] = None) -> List[Dict[str, str]]:
+    """
+    Extracts destination titles (h2 or h3) and their paragraph texts from HTML,
+    returns as [{'title': ..., 'content': ...}, ...].
+    - If `url` matches an extraction rule, that rule's selectors are used instead.
+    """
+    rule = select_rule(url, rules)
+    if rule is not None:
+        return rule.extract(html)
+    return list(iter_destinations(html))
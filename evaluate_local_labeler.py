@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+evaluate_local_labeler.py  –  Yerel etiketleyicinin Gemini etiketlerine göre ölçümü
+
+Mevcut etiketli çıktıları k parçaya böler; her parçayı geri kalanla eğitilen
+LocalLabeler ile etiketler ve farklı güven eşiklerinde şunları raporlar:
+• Kapsam: yerelde etiketlenen (Gemini'ye gitmeyecek) kayıtların oranı
+• Bu kayıtlarda Gemini etiketlerine göre kesinlik / duyarlılık / F1 (mikro)
+
+Kullanım örneği:
+    python evaluate_local_labeler.py --data "labeled_output*.json" --thresholds 0.25 0.35 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from typing import Any, Dict, List, Sequence
+
+from label_normalizer import normalize_labels
+from local_labeler import LOCAL_LABELER_DATA, LocalLabeler, load_training_records
+from sqlite_cache import is_disabled
+
+DEFAULT_DATA = "labeled_output.json" if is_disabled(LOCAL_LABELER_DATA) else LOCAL_LABELER_DATA
+
+
+def _labels(record: Dict[str, Any]) -> List[str]:
+    return normalize_labels(str(label) for label in record["labels"])
+
+
+def evaluate(records: List[Dict[str, Any]], thresholds: Sequence[float], folds: int = 5, seed: int = 0) -> Dict[float, Dict[str, float]]:
+    """
+    Cross-validated coverage, precision, recall and F1 of the local labeler per threshold.
+    Labels are normalized exactly as train_from_files does for the production labeler.
+    """
+    records = list(records)
+    random.Random(seed).shuffle(records)
+    folds = max(2, min(folds, len(records)))
+    totals = {t: {"covered": 0, "tp": 0, "predicted": 0, "expected": 0} for t in thresholds}
+    for fold in range(folds):
+        test = records[fold::folds]
+        train = [r for i, r in enumerate(records) if i % folds != fold]
+        labeler = LocalLabeler().fit([r["content"] for r in train], [_labels(r) for r in train])
+        for threshold in thresholds:
+            counts = totals[threshold]
+            for record, (predicted, _) in zip(test, labeler.predict([r["content"] for r in test], threshold)):
+                if not predicted:
+                    continue
+                expected = set(_labels(record))
+                counts["covered"] += 1
+                counts["predicted"] += len(predicted)
+                counts["expected"] += len(expected)
+                counts["tp"] += len(expected & set(predicted))
+    report = {}
+    for threshold, c in totals.items():
+        precision = c["tp"] / c["predicted"] if c["predicted"] else 0.0
+        recall = c["tp"] / c["expected"] if c["expected"] else 0.0
+        report[threshold] = {
+            "coverage": c["covered"] / len(records) if records else 0.0,
+            "precision": precision,
+            "recall": recall,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        }
+    return report
+
+
+def _cli() -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description="Yerel etiketleyiciyi mevcut Gemini etiketleriyle karşılaştır")
+    p.add_argument("--data", default=DEFAULT_DATA, help="Virgülle ayrılmış etiketli JSON dosyaları / desenleri")
+    p.add_argument("--thresholds", type=float, nargs="+", default=[0.2, 0.3, 0.35, 0.4, 0.5, 0.6])
+    p.add_argument("--folds", type=int, default=5)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    records = load_training_records(args.data.split(","))
+    if len(records) < 2:
+        print("Değerlendirme için yeterli etiketli kayıt yok.")
+        return
+    print(f"{len(records)} kayıt, {args.folds} katlı çapraz doğrulama\n")
+    print(f"{'Eşik':>6}{'Kapsam':>10}{'Kesinlik':>10}{'Duyarlılık':>12}{'F1':>8}")
+    for threshold, m in evaluate(records, args.thresholds, args.folds, args.seed).items():
+        print(f"{threshold:>6.2f}{m['coverage']:>10.1%}{m['precision']:>10.1%}{m['recall']:>12.1%}{m['f1']:>8.2f}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _cli()
@@ -1,58 +1,387 @@
 import os
 import json
+import ast
+import random
+import re
+import sys
+import threading
+import time
+import hashlib
 import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Optional, Sequence, TextIO
+
+from checkpoint import CheckpointLog, record_id
+from label_cache import LabelCache, get_label_cache
+from label_normalizer import normalize_labels
+from local_labeler import get_local_labeler
+from rate_limit import TokenBucket
+from record_stream import iter_records, repair_jsonl_tail
+
+# Optional: typed quota errors from the Google client
+try:
+    from google.api_core import exceptions as google_exceptions  # type: ignore
+except ImportError:  # quota errors are then recognised by their message
+    google_exceptions = None
 
 # Load environment variables
 load_dotenv()
 
+# Per-item progress of process_changed_json; removed once labeled_output.json is written
+LABEL_CHECKPOINT = "labeling_checkpoint.jsonl"
+
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
+# Quotas of the API key: requests and tokens per minute, and parallel requests
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "250000"))
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "4"))
+# Tokens a labeling answer is expected to use, added to the prompt estimate
+OUTPUT_TOKENS_ESTIMATE = 32
+# Texts per labeling request (1 = one request per text) and prompt-token budget per batch
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "10"))
+GEMINI_BATCH_TOKENS = int(os.getenv("GEMINI_BATCH_TOKENS", "4000"))
+# Records held in memory at a time by the streaming labeler
+STREAM_WINDOW = 256
+# A successful health check is trusted for this many seconds, in this process and,
+# through the health file, in later runs (CLI and Streamlit alike)
+GEMINI_HEALTH_TTL = float(os.getenv("GEMINI_HEALTH_TTL", "600"))
+GEMINI_HEALTH_FILE = os.getenv("GEMINI_HEALTH_FILE", ".gemini_health.json")
+
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+# Process-wide quota buckets shared by every label_texts call (created on first use)
+_default_limiters: Optional[tuple] = None
+_default_limiters_lock = threading.Lock()
+# Fingerprint of (API key, model) -> time of the last successful health check
+_health_checks: Dict[str, float] = {}
+
+# Part of the label cache key: editing the prompt invalidates previously cached labels
+PROMPT_TEMPLATE = "Metni etiketle. En fazla 3 kısa Türkçe etiket ver. Sadece JSON liste döndür: [\"etiket1\", ...]\n\n{text}"
+
+BATCH_PROMPT_TEMPLATE = (
+    "Aşağıdaki her metni etiketle. Her metin için en fazla 3 kısa Türkçe etiket ver. "
+    "Sadece JSON nesne döndür, anahtarlar köşeli parantezdeki numaralar: "
+    "{{\"1\": [\"etiket1\", ...], \"2\": [...]}}\n\n{items}"
+)
+
 def create_minimal_prompt(text: str) -> str:
     """
     Create a minimal, low-token prompt for Gemini to generate up to 3 Turkish labels for the given text.
     """
-    return f"Metni etiketle. En fazla 3 kısa Türkçe etiket ver. Sadece JSON liste döndür: [\"etiket1\", ...]\n\n{text}"
+    return PROMPT_TEMPLATE.format(text=text)
+
+def _api_key() -> str:
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key or api_key == "your_gemini_api_key_here":
+        raise ValueError("GEMINI_API_KEY not found in .env file")
+    return api_key
+
+def get_model(model_name: str = MODEL_NAME):
+    """
+    Returns the shared GenerativeModel, configuring the API key on first use.
+    """
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            genai.configure(api_key=_api_key())
+            model = _models[model_name] = genai.GenerativeModel(model_name)
+        return model
 
-def test_gemini_connection() -> bool:
+def _probe_model(api_key: str, model_name: str) -> None:
+    # Model metadata lookup: validates the key and model without generating (or billing) tokens
+    genai.configure(api_key=api_key)
+    genai.get_model(f"models/{model_name}")
+
+def _read_health_file() -> Dict[str, float]:
     try:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key or api_key == "your_gemini_api_key_here":
-            return False
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro')
-        response = model.generate_content("Test")
-        return True
+        with open(GEMINI_HEALTH_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def check_gemini_health(force: bool = False, ttl: Optional[float] = None, model_name: str = MODEL_NAME, probe=None) -> bool:
+    """
+    Returns whether the API key can reach the model, using a cheap metadata call.
+    - A success is reused for `ttl` seconds (default GEMINI_HEALTH_TTL) unless `force` is set;
+      failures are never cached. Only a hash of the key is stored.
+    """
+    try:
+        api_key = _api_key()
+    except ValueError:
+        return False
+    ttl = GEMINI_HEALTH_TTL if ttl is None else ttl
+    fingerprint = hashlib.sha256(f"{api_key}:{model_name}".encode("utf-8")).hexdigest()[:16]
+    now = time.time()
+    if not force:
+        checked_at = _health_checks.get(fingerprint) or _read_health_file().get(fingerprint, 0)
+        if now - checked_at <= ttl:
+            return True
+    try:
+        (probe or _probe_model)(api_key, model_name)
     except Exception:
         return False
+    _health_checks[fingerprint] = now
+    checks = {**_read_health_file(), fingerprint: now}
+    try:
+        with open(GEMINI_HEALTH_FILE, "w", encoding="utf-8") as f:
+            json.dump(checks, f)
+    except OSError:
+        pass  # the in-process cache still applies
+    return True
+
+def test_gemini_connection(force: bool = False) -> bool:
+    return check_gemini_health(force=force)
+
+def _string_list(value: Any) -> Optional[List[str]]:
+    if isinstance(value, list) and all(isinstance(label, str) for label in value):
+        return value
+    return None
 
-def generate_labels_for_text(text: str) -> List[str]:
+def parse_labels(raw_response: str) -> List[str]:
+    """
+    Extracts up to 3 canonical labels from the model's answer: a JSON list of strings, possibly
+    wrapped in text or a code fence. Anything else (dicts, numbers, unbalanced brackets) gives [].
+    """
+    match = re.search(r'\[.*\]', raw_response, re.DOTALL)
+    if not match:
+        return []
+    try:
+        labels = _string_list(json.loads(match.group(0)))
+    except ValueError:
+        # Single-quoted Python lists are still accepted, but nothing looser
+        try:
+            labels = _string_list(ast.literal_eval(match.group(0)))
+        except (ValueError, SyntaxError):
+            labels = None
+    return normalize_labels(label for label in labels if label.strip())[:3] if labels else []
+
+def get_default_limiters() -> tuple:
+    """
+    Returns the shared (requests, tokens) buckets for GEMINI_RPM / GEMINI_TPM, so concurrent
+    callers and successive label_texts calls draw from one quota and see each other's pauses.
+    """
+    global _default_limiters
+    with _default_limiters_lock:
+        if _default_limiters is None:
+            _default_limiters = (TokenBucket.per_minute(GEMINI_RPM), TokenBucket.per_minute(GEMINI_TPM))
+        return _default_limiters
+
+def _model_name(model) -> str:
+    # GenerativeModel.model_name is "models/<name>"; cache keys use the bare name
+    return (getattr(model, "model_name", None) or MODEL_NAME).split("/")[-1]
+
+def _resolve_cache(cache) -> Optional[LabelCache]:
+    # None = shared cache (if enabled), False = no cache
+    if cache is None:
+        return get_label_cache()
+    return cache or None
+
+def generate_labels_for_text(text: str, model=None, cache=None) -> List[str]:
+    cache = _resolve_cache(cache)
+    model_name = _model_name(model)
+    if cache is not None:
+        cached = cache.get(model_name, PROMPT_TEMPLATE, text)
+        if cached is not None:
+            return normalize_labels(cached)
     try:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key or api_key == "your_gemini_api_key_here":
-            raise ValueError("GEMINI_API_KEY not found in .env file")
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro')
+        model = model or get_model()
         prompt = create_minimal_prompt(text)
         response = model.generate_content(prompt)
-        raw_response = response.text.strip()
-        import ast
-        try:
-            labels = ast.literal_eval(raw_response)
-            if isinstance(labels, list):
-                return labels[:3]
-            else:
-                return []
-        except:
-            # Fallback: try to extract labels from brackets
-            import re
-            match = re.search(r'\[(.*?)\]', raw_response)
-            if match:
-                items = [x.strip().strip('"\'') for x in match.group(1).split(',') if x.strip()]
-                return items[:3]
-            return []
+        labels = parse_labels(response.text.strip())
     except Exception as e:
-        print(f"Error generating labels: {str(e)}")
+        print(f"Error generating labels: {str(e)}", file=sys.stderr)
         return []
+    if cache is not None:
+        cache.put(model_name, PROMPT_TEMPLATE, text, labels)
+    return labels
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about 4 characters per token), used for the tokens/minute budget.
+    """
+    return len(text) // 4 + 1
+
+def is_quota_error(error: Exception) -> bool:
+    if google_exceptions is not None and isinstance(
+        error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests, google_exceptions.ServiceUnavailable)
+    ):
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+def create_batch_prompt(items: Sequence[tuple]) -> str:
+    """
+    Prompt asking for labels of several (id, text) items at once, answered as one JSON object keyed by id.
+    """
+    body = "\n\n".join(f"[{item_id}] {' '.join(text.split())}" for item_id, text in items)
+    return BATCH_PROMPT_TEMPLATE.format(items=body)
+
+def parse_batch_labels(raw_response: str, ids: Sequence[str]) -> Dict[str, List[str]]:
+    """
+    Returns {id: labels} for every requested id with a well-formed answer (a list of strings);
+    missing or malformed ids are left out so the caller can retry them one by one.
+    """
+    match = re.search(r'\{.*\}', raw_response, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        answer = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(answer, dict):
+        return {}
+    labels = {}
+    for item_id in ids:
+        value = answer.get(item_id)
+        if _string_list(value) is not None:
+            labels[item_id] = normalize_labels(label for label in value if label.strip())[:3]
+    return labels
+
+def make_batches(texts: Sequence[str], indices: Sequence[int], batch_size: int, token_budget: int) -> List[List[int]]:
+    """
+    Groups indices into batches of at most `batch_size` items and about `token_budget` prompt tokens.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    tokens = 0
+    for index in indices:
+        cost = estimate_tokens(texts[index])
+        if current and (len(current) >= batch_size or tokens + cost > token_budget):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(index)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def label_texts(
+    texts: Sequence[str],
+    model=None,
+    concurrency: int = GEMINI_CONCURRENCY,
+    requests_limiter: Optional[TokenBucket] = None,
+    tokens_limiter: Optional[TokenBucket] = None,
+    max_retries: int = 5,
+    base_delay: float = 2.0,
+    max_delay: float = 60.0,
+    on_result: Optional[Callable[[int, List[str]], None]] = None,
+    on_error: Optional[Callable[[int, Exception], None]] = None,
+    cache=None,
+    batch_size: int = GEMINI_BATCH_SIZE,
+    batch_tokens: int = GEMINI_BATCH_TOKENS,
+    local=None,
+) -> List[List[str]]:
+    """
+    Labels many texts concurrently with one shared model and returns the labels in input order.
+    - Requests/minute and tokens/minute are enforced by the limiters (defaults: the process-wide
+      GEMINI_RPM / GEMINI_TPM buckets from get_default_limiters()).
+    - Quota errors pause every worker for a jittered, exponentially growing delay and are
+      retried up to `max_retries` times; other errors give [] for that text.
+    - `on_result(index, labels)` is called as each text is labeled successfully,
+      `on_error(index, error)` when a text could not be labeled.
+    - Texts found in the label cache (`cache`: None = shared cache, False = off) are not sent.
+    - With `batch_size` > 1, up to that many texts (and about `batch_tokens` prompt tokens)
+      share one request; ids missing or malformed in the answer are retried one by one.
+      Labels from batched runs are cached under the batch prompt template.
+    - Texts the local labeler (`local`: None = shared one, enabled by LOCAL_LABELER_DATA; False = off)
+      labels with enough confidence are not sent either.
+    """
+    template = BATCH_PROMPT_TEMPLATE if batch_size > 1 else PROMPT_TEMPLATE
+    cache = _resolve_cache(cache)
+    local = get_local_labeler() if local is None else (local or None)
+    model_name = _model_name(model)
+    results: List[List[str]] = [[] for _ in texts]
+    predictions = local.predict(texts) if local is not None else [([], 0.0)] * len(texts)
+    misses = []
+    for index, text in enumerate(texts):
+        local_labels, _ = predictions[index]
+        if local_labels:
+            results[index] = local_labels
+            if on_result is not None:
+                on_result(index, local_labels)
+            continue
+        cached = cache.get(model_name, template, text) if cache is not None else None
+        if cached is None:
+            misses.append(index)
+            continue
+        # Entries cached before normalization existed are normalized on the way out
+        results[index] = cached = normalize_labels(cached)
+        if on_result is not None:
+            on_result(index, cached)
+    if not misses:
+        return results
+    model = model or get_model()
+    default_requests, default_tokens = get_default_limiters()
+    requests_limiter = requests_limiter or default_requests
+    tokens_limiter = tokens_limiter or default_tokens
+
+    def generate(prompt: str, output_tokens: int) -> str:
+        attempt = 0
+        while True:
+            requests_limiter.acquire()
+            tokens_limiter.acquire(estimate_tokens(prompt) + output_tokens)
+            try:
+                return model.generate_content(prompt).text.strip()
+            except Exception as e:
+                if not is_quota_error(e) or attempt >= max_retries:
+                    print(f"Error generating labels: {str(e)}", file=sys.stderr)
+                    raise
+                # Full jitter keeps the workers from retrying in lockstep
+                requests_limiter.pause(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+                attempt += 1
+
+    def finish(index: int, labels: List[str]) -> None:
+        results[index] = labels
+        if cache is not None:
+            cache.put(model_name, template, texts[index], labels)
+        if on_result is not None:
+            on_result(index, labels)
+
+    def label_one(index: int) -> None:
+        try:
+            raw_response = generate(create_minimal_prompt(texts[index]), OUTPUT_TOKENS_ESTIMATE)
+        except Exception as e:
+            if on_error is not None:
+                on_error(index, e)
+            return
+        finish(index, parse_labels(raw_response))
+
+    def label_batch(batch: List[int]) -> None:
+        if len(batch) == 1:
+            label_one(batch[0])
+            return
+        ids = [str(n) for n in range(1, len(batch) + 1)]
+        try:
+            raw_response = generate(create_batch_prompt(list(zip(ids, (texts[i] for i in batch)))), OUTPUT_TOKENS_ESTIMATE * len(batch))
+            answers = parse_batch_labels(raw_response, ids)
+        except Exception:
+            answers = {}
+        for item_id, index in zip(ids, batch):
+            if item_id in answers:
+                finish(index, answers[item_id])
+            else:
+                label_one(index)
+
+    batches = make_batches(texts, misses, batch_size, batch_tokens) if batch_size > 1 else [[index] for index in misses]
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as pool:
+        list(pool.map(label_batch, batches))
+    return results
+
+def label_text(text: str, **label_options: Any) -> List[str]:
+    """
+    Labels one text through label_texts, so callers with their own worker threads still share
+    the GEMINI_RPM / GEMINI_TPM quota, the quota retries and the cache.
+    Unlike generate_labels_for_text, a failure raises instead of returning [].
+    """
+    labeled: List[List[str]] = []
+    failed: List[Exception] = []
+    label_texts([text], on_result=lambda _, labels: labeled.append(labels),
+                on_error=lambda _, error: failed.append(error), **label_options)
+    if failed:
+        raise failed[0]
+    return labeled[0] if labeled else []
 
 def process_changed_json() -> List[Dict[str, Any]]:
     try:
@@ -60,36 +389,151 @@ def process_changed_json() -> List[Dict[str, Any]]:
             data = json.load(f)
         if not test_gemini_connection():
             raise RuntimeError("Gemini API connection failed. Please check your API key.")
+        checkpoint = CheckpointLog(LABEL_CHECKPOINT)
+        # Items labeled before an interruption are taken from the checkpoint log
+        done = checkpoint.completed("label")
         labeled_data = []
+        pending = []
         for item in data:
-            text = item.get("content", "")
-            title = item.get("title", "")
-            if text:
-                labels = generate_labels_for_text(text)
-                labeled_item = {
-                    "title": title,
-                    "content": text,
-                    "labels": labels
-                }
-                labeled_data.append(labeled_item)
+            rid = record_id(item)
+            if rid in done:
+                labeled_data.append(done[rid])
+                continue
+            labeled_item = {
+                "title": item.get("title", ""),
+                "content": item.get("content", ""),
+                "labels": []
+            }
+            labeled_data.append(labeled_item)
+            if labeled_item["content"]:
+                pending.append((rid, labeled_item))
             else:
-                labeled_item = {
-                    "title": title,
-                    "content": text,
-                    "labels": []
-                }
-                labeled_data.append(labeled_item)
+                checkpoint.append(rid, "label", labeled_item)
+
+        def save(index: int, labels: List[str]) -> None:
+            rid, labeled_item = pending[index]
+            labeled_item["labels"] = labels
+            checkpoint.append(rid, "label", labeled_item)
+
+        label_texts([labeled_item["content"] for _, labeled_item in pending], on_result=save)
+        cache = get_label_cache()
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Label cache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} entries)")
         with open("labeled_output.json", "w", encoding="utf-8") as f:
             json.dump(labeled_data, f, ensure_ascii=False, indent=2)
+        checkpoint.clear()
         return labeled_data
     except Exception as e:
         print(f"Error processing changed.json: {str(e)}")
         raise
 
-if __name__ == "__main__":
-    if test_gemini_connection():
-        print("✅ Gemini API connection successful!")
+def label_records(records: Iterable[Dict[str, Any]], out: TextIO, window: int = STREAM_WINDOW,
+                  skip_ids: Optional[set] = None, **label_options: Any) -> Dict[str, int]:
+    """
+    Labels a stream of records and writes each one to `out` as a JSON line as soon as it is done.
+    - Only `window` records are held in memory at a time; output follows completion order.
+    - Output records are the input records plus "labels"; records whose labeling failed
+      are written with "label_error": true. Records whose id is in `skip_ids` are skipped.
+    - `label_options` are passed to label_texts. Returns labeled/failed/skipped counts.
+    """
+    counts = {"labeled": 0, "failed": 0, "skipped": 0}
+    lock = threading.Lock()
+
+    def write(record: Dict[str, Any], key: str) -> None:
+        with lock:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[key] += 1
+
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, window))
+        if not chunk:
+            break
+        pending = []
+        for item in chunk:
+            if skip_ids and record_id(item) in skip_ids:
+                counts["skipped"] += 1
+            elif item.get("content"):
+                pending.append(item)
+            else:
+                write({**item, "labels": []}, "labeled")
+        done = set()
+
+        def save(index: int, labels: List[str]) -> None:
+            done.add(index)
+            write({**pending[index], "labels": labels}, "labeled")
+
+        label_texts([item["content"] for item in pending], on_result=save, **label_options)
+        for index, item in enumerate(pending):
+            if index not in done:
+                write({**item, "labels": [], "label_error": True}, "failed")
+    return counts
+
+def label_file(in_path: str, out_path: str, resume: bool = True, **label_options: Any) -> Dict[str, int]:
+    """
+    Streams `in_path` (JSONL, or a JSON array parsed incrementally) into the JSONL file `out_path`.
+    With `resume`, records already labeled in `out_path` are skipped and new ones appended,
+    so an interrupted run continues where it stopped; a line torn by the crash is dropped.
+    Records that failed before are retried and their old failure lines are removed afterwards.
+    """
+    skip_ids = set()
+    failed_ids = set()
+    start = 0
+    if resume and os.path.exists(out_path):
+        repair_jsonl_tail(out_path)
+        for record in iter_records(out_path):
+            (failed_ids if record.get("label_error") else skip_ids).add(record_id(record))
+        start = os.path.getsize(out_path)
+    with open(out_path, "a" if resume else "w", encoding="utf-8") as out:
+        counts = label_records(iter_records(in_path), out, skip_ids=skip_ids, **label_options)
+    if failed_ids:
+        _drop_retried_failures(out_path, start, failed_ids - skip_ids)
+    return counts
+
+def _drop_retried_failures(path: str, start: int, failed_ids: set) -> None:
+    """
+    Removes the failure lines before byte `start` of records in `failed_ids` that were written
+    again after it, so every record keeps one line. Streams the file; only ids are kept in memory.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        rewritten = {record_id(json.loads(line)) for line in f if line.strip()} & failed_ids
+    if not rewritten:
+        return
+    tmp_path = path + ".tmp"
+    offset = 0
+    with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+        for line in src:
+            old = offset < start
+            offset += len(line)
+            if old and line.strip():
+                record = json.loads(line)
+                if record.get("label_error") and record_id(record) in rewritten:
+                    continue
+            dst.write(line)
+    os.replace(tmp_path, path)
+
+def _cli() -> None:  # pragma: no cover
+    import argparse
+
+    p = argparse.ArgumentParser(description="Label destinations with Gemini")
+    p.add_argument("--in", dest="infile", default=None, help="Streaming mode: input .jsonl or .json array file")
+    p.add_argument("--out", default="labeled_output.jsonl", help="Streaming mode: JSONL output file")
+    p.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of continuing it")
+    args = p.parse_args()
+
+    if not test_gemini_connection():
+        print("❌ Gemini API connection failed!")
+        return
+    print("✅ Gemini API connection successful!")
+    if args.infile is None:
         result = process_changed_json()
         print(f"✅ Processed {len(result)} items with labels")
-    else:
-        print("❌ Gemini API connection failed!") 
\ No newline at end of file
+        return
+    counts = label_file(args.infile, args.out, resume=not args.no_resume)
+    print(f"✅ Labeled {counts['labeled']} items, {counts['failed']} failed, {counts['skipped']} already done → {args.out}")
+
+if __name__ == "__main__":
+    _cli() 
\ No newline at end of file
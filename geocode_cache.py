@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Coğrafi kodlama önbelleği
+Nominatim / Photon / OpenCage sorgu sonuçlarını (sağlayıcı, normalize sorgu) anahtarıyla
+SQLite'ta saklar; aynı dosya yeniden koordinatlanırken ağa çıkılmaz.
+
+• Bulunan koordinatlar GEOCODE_CACHE_TTL (varsayılan 30 gün) boyunca geçerlidir
+• "Bulunamadı" sonuçları da saklanır, ama daha kısa süre (GEOCODE_CACHE_NEGATIVE_TTL, 1 gün)
+• Zaman aşımı / servis hatası önbelleğe yazılmaz; sonraki çalıştırmada yeniden denenir
+• GEOCODE_CACHE=off önbelleği kapatır; CLI (geocoding_cli) ve Streamlit aynı dosyayı paylaşır
+
+Kullanım örneği:
+    python geocode_cache.py            # kayıt sayısı
+    python geocode_cache.py --prune    # süresi dolmuş kayıtları sil
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import unicodedata
+from typing import Any, Callable, Optional, Tuple
+
+from label_normalizer import turkish_lower
+from sqlite_cache import Shared, SQLiteCache, run_cli
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE", "geocode_cache.sqlite3")
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+GEOCODE_CACHE_NEGATIVE_TTL = float(os.getenv("GEOCODE_CACHE_NEGATIVE_TTL", str(24 * 3600)))
+
+Point = Tuple[float, float]
+
+# get() result when the query is not cached (None means "cached as not found")
+MISS = object()
+
+
+def normalize_query(query: str) -> str:
+    """NFC, Turkish lowercase, whitespace collapsed and ", " between parts."""
+    text = turkish_lower(unicodedata.normalize("NFC", query))
+    return ", ".join(" ".join(part.split()) for part in text.split(",") if part.strip())
+
+
+def location_point(location: Any) -> Optional[Point]:
+    """(latitude, longitude) of a geopy Location, or None."""
+    if not location:
+        return None
+    return location.latitude, location.longitude
+
+
+class GeocodeCache(SQLiteCache):
+    """
+    SQLite-backed geocoding cache keyed by (provider, normalized query).
+    - Hits expire after `ttl` seconds, negative results after `negative_ttl` seconds.
+    - One connection per thread (WAL mode), so concurrent geocoding workers can share it.
+    """
+
+    def __init__(
+        self,
+        path: str = GEOCODE_CACHE_PATH,
+        ttl: float = GEOCODE_CACHE_TTL,
+        negative_ttl: float = GEOCODE_CACHE_NEGATIVE_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(
+            path,
+            "geocodes",
+            "CREATE TABLE IF NOT EXISTS geocodes ("
+            " provider TEXT NOT NULL,"
+            " query TEXT NOT NULL,"
+            " latitude REAL,"
+            " longitude REAL,"
+            " stored_at REAL NOT NULL,"
+            " PRIMARY KEY (provider, query))",
+        )
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+
+    def get(self, provider: str, query: str) -> Any:
+        """
+        Returns the cached point, None for a cached "not found", or MISS.
+        """
+        row = self._connect().execute(
+            "SELECT latitude, longitude, stored_at FROM geocodes WHERE provider = ? AND query = ?",
+            (provider, normalize_query(query)),
+        ).fetchone()
+        result: Any = MISS
+        if row is not None:
+            latitude, longitude, stored_at = row
+            found = latitude is not None
+            if self.clock() - stored_at < (self.ttl if found else self.negative_ttl):
+                result = (latitude, longitude) if found else None
+        self._count(result is not MISS)
+        return result
+
+    def put(self, provider: str, query: str, point: Optional[Point]) -> None:
+        latitude, longitude = point if point else (None, None)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocodes (provider, query, latitude, longitude, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (provider, normalize_query(query), latitude, longitude, self.clock()),
+            )
+
+    def lookup(self, provider: str, query: str, fetch: Callable[[], Optional[Point]]) -> Optional[Point]:
+        """
+        Cached result of `query`, calling `fetch()` (the real request) only on a miss.
+        Exceptions from `fetch` propagate and nothing is stored.
+        """
+        cached = self.get(provider, query)
+        if cached is not MISS:
+            return cached
+        point = fetch()
+        self.put(provider, query, point)
+        return point
+
+    def prune(self) -> int:
+        """Deletes expired entries and returns how many were deleted."""
+        now = self.clock()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM geocodes WHERE (latitude IS NOT NULL AND stored_at <= ?)"
+                " OR (latitude IS NULL AND stored_at <= ?)",
+                (now - self.ttl, now - self.negative_ttl),
+            )
+            return cursor.rowcount
+
+
+_shared = Shared(lambda: GEOCODE_CACHE_PATH, GeocodeCache)
+
+
+def get_geocode_cache() -> Optional[GeocodeCache]:
+    """
+    Returns the shared geocoding cache, or None when GEOCODE_CACHE is "off"/empty.
+    """
+    return _shared.get()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    run_cli(
+        "Coğrafi kodlama önbelleği bakımı",
+        GEOCODE_CACHE_PATH,
+        GeocodeCache,
+        ("prune", "Süresi dolmuş kayıtları sil", GeocodeCache.prune),
+    )
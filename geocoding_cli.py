@@ -2,8 +2,14 @@
 """
 geocoding_cli.py  –  Tek dosyada coğrafi kodlama kütüphanesi + CLI
 
-• JSON içinden başlıkları okuyup ardışık olarak 4 algoritma uygular
+• JSON içinden başlıkları okuyup sırayla 4 algoritma dener
   (Nominatim basic ➊, Geliştirilmiş Nominatim ➋, Photon ➌, OpenCage ➍)
+• Sağlayıcılar eşzamanlı çalışır, her birinin kendi hız sınırı vardır: Nominatim'in
+  bulamadığı yer, Nominatim sıradaki yerle uğraşırken Photon'da denenir
+• Sorgu sonuçları geocode_cache ile diskte saklanır; tekrar çalıştırmada yalnızca
+  önbellekte olmayan sorgular ağa çıkar ve hız sınırına takılır
+• Hız sınırı sabit bekleme değil, sağlayıcı başına paylaşılan token bucket'tır: yalnızca
+  son gerçek istekten bu yana gereken kadar beklenir; 429 yanıtındaki Retry-After'a uyulur
 • Çıktıları 2 JSON dosyasına yazar: coor_resolved.json & coor_remaining.json
 • İstendiğinde kütüphane gibi de içe aktarılabilir (from geocoding_cli import GeocodingSystem)
 
@@ -17,14 +23,19 @@ import argparse
 import json
 import os
 import sys
-import time
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from geopy.exc import GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable
 from geopy.geocoders import Nominatim, Photon
 
+from geocode_cache import GeocodeCache, Point, get_geocode_cache, location_point
+from rate_limit import PROVIDER_RATES, TokenBucket, limited_request, provider_limiter
+
 # ------------------------------------------------------------
 # Opsiyonel: OpenCage
 try:
@@ -34,14 +45,27 @@ except ImportError:  # kitaplık yoksa sorun değil; 4. aşama atlanır
 
 load_dotenv()
 
+# ------------------------------------------------------------
+# Sağlayıcı başına eşzamanlı işçi sayısı (hız sınırları: rate_limit.PROVIDER_RATES)
+PROVIDER_WORKERS: Dict[str, int] = {"nominatim": 1, "photon": 2, "opencage": 1}
+
 
 class GeocodingSystem:
     """OpenStreetMap tabanlı 4-aşamalı coğrafi kodlayıcı."""
 
-    def __init__(self, sleep: float = 1.0):
-        self.sleep = sleep  # API saygısı
+    def __init__(self, sleep: float | None = None, *, limiters: Optional[Dict[str, TokenBucket]] = None,
+                 workers: Optional[Dict[str, int]] = None, cache: GeocodeCache | None | bool = None):
+        if sleep is not None:
+            # Eski sabit bekleme yerine sağlayıcı başına hız sınırlayıcılar (rate_limit.PROVIDER_RATES)
+            warnings.warn("GeocodingSystem(sleep=...) is ignored; set NOMINATIM_RPS / PHOTON_RPS / OPENCAGE_RPS "
+                          "or pass limiters", DeprecationWarning, stacklevel=2)
         self.nominatim = Nominatim(user_agent="geo_cli")
         self.opencage_key: str | None = os.getenv("OPENCAGE_API_KEY")
+        self.limiters = {provider: provider_limiter(provider) for provider in PROVIDER_RATES}
+        self.limiters.update(limiters or {})
+        self.workers = {**PROVIDER_WORKERS, **(workers or {})}
+        # None = paylaşılan önbellek (GEOCODE_CACHE), False = önbelleksiz
+        self.cache = get_geocode_cache() if cache is None else (cache or None)
         self._reset()
 
     # -------------------------- JSON Yardımcıları ------------------------- #
@@ -74,14 +98,25 @@ class GeocodingSystem:
                 })
         return locs
 
+    # ------------------------- Önbellekli sorgu -------------------------- #
+    def _geocode(self, provider: str, query: str, fetch: Callable[[], Point | None]) -> Point | None:
+        """
+        Answers from the cache when possible; only real requests wait for the provider's limiter.
+        Errors raised by `fetch` are not cached.
+        """
+        def request() -> Point | None:
+            return limited_request(self.limiters[provider], fetch)
+
+        if self.cache is None:
+            return request()
+        return self.cache.lookup(provider, query, request)
+
     # ------------------------- AŞAMA 1: Nominatim Basic ------------------- #
     def _nominatim(self, title: str, city: str, country: str, district: str = "") -> Tuple[float, float] | None:
         query = ", ".join(x for x in (title, district, city, country) if x)
         try:
-            res = self.nominatim.geocode(query, timeout=10)
-            if res:
-                return res.latitude, res.longitude
-        except (GeocoderTimedOut, GeocoderUnavailable):
+            return self._geocode("nominatim", query, lambda: location_point(self.nominatim.geocode(query, timeout=10)))
+        except (GeocoderTimedOut, GeocoderUnavailable, GeocoderRateLimited):
             pass
         return None
 
@@ -104,12 +139,11 @@ class GeocodingSystem:
                 tokens.append(f"{title}, {keyword.title()}, {country}")
         for q in tokens:
             try:
-                res = self.nominatim.geocode(q, timeout=10)
-                if res:
-                    return res.latitude, res.longitude
-            except (GeocoderTimedOut, GeocoderUnavailable):
+                coords = self._geocode("nominatim", q, lambda: location_point(self.nominatim.geocode(q, timeout=10)))
+                if coords:
+                    return coords
+            except (GeocoderTimedOut, GeocoderUnavailable, GeocoderRateLimited):
                 continue
-            time.sleep(self.sleep)
         return None
 
     # ------------------------- AŞAMA 3: Photon ---------------------------- #
@@ -125,12 +159,11 @@ class GeocodingSystem:
             variants.insert(0, f"{title}, {district}, {city}, {country}")
         for q in variants:
             try:
-                res = geo.geocode(q, timeout=10)
-                if res:
-                    return res.latitude, res.longitude
+                coords = self._geocode("photon", q, lambda: location_point(geo.geocode(q, timeout=10)))
+                if coords:
+                    return coords
             except Exception:
                 continue
-            time.sleep(self.sleep)
         return None
 
     # ------------------------- AŞAMA 4: OpenCage -------------------------- #
@@ -139,31 +172,68 @@ class GeocodingSystem:
             return None
         coder = OpenCageGeocode(self.opencage_key)
         query = ", ".join(x for x in (title, district, city, country) if x)
-        try:
+
+        def fetch() -> Point | None:
             results = coder.geocode(query, countrycode="tr")
             if results:
                 g = results[0]["geometry"]
                 return g["lat"], g["lng"]
+            return None
+
+        try:
+            return self._geocode("opencage", query, fetch)
         except Exception:
             pass
         return None
 
     # ------------------------- PIPELINE ---------------------------------- #
+    def _steps(self, city: str, country: str, district: str) -> List[Tuple[str, str, Callable[[Dict], Tuple[float, float] | None]]]:
+        """(method name, provider, function) in the order each location tries them."""
+        steps = [
+            ("nominatim_basic",    "nominatim", lambda loc: self._nominatim(loc["title"], city, country, district)),
+            ("nominatim_variants", "nominatim", lambda loc: self._nominatim_variants(loc["title"], city, country, loc["content"], district)),
+            ("photon",             "photon",    lambda loc: self._photon(loc["title"], city, country, district)),
+        ]
+        if self.opencage_key and OpenCageGeocode:
+            steps.append(("opencage", "opencage", lambda loc: self._opencage(loc["title"], city, country, district)))
+        return steps
+
     def resolve(self, locations: List[Dict], *, city: str = "", country: str = "Türkiye", district: str = "") -> None:
+        """
+        Geocodes `locations` in place, trying the steps in order for each location.
+        - Every provider has its own worker pool and rate limiter, so the providers work in
+          parallel: a location Nominatim could not find moves on to Photon right away.
+        - Consecutive steps of one provider run as one task, so a location finishes its
+          Nominatim steps before Nominatim starts the next location.
+        - resolved/remaining keep the input order.
+        """
         self._reset()
-        candidates = locations
-        for step_name, step_fn in [
-            ("nominatim_basic",       lambda loc: self._nominatim(loc["title"], city, country, district)),
-            ("nominatim_variants",    lambda loc: self._nominatim_variants(loc["title"], city, country, loc["content"], district)),
-            ("photon",                lambda loc: self._photon(loc["title"], city, country, district)),
-            ("opencage",              lambda loc: self._opencage(loc["title"], city, country, district)),
-        ]:
-            next_round: List[Dict] = []
-            for loc in candidates:
-                if loc.get("coordinates"):
-                    self.resolved.append(loc)
-                    continue
-                coords = step_fn(loc)
+        stages: List[Tuple[str, List[Tuple[str, Callable]]]] = []
+        for step_name, provider, step_fn in self._steps(city, country, district):
+            if not stages or stages[-1][0] != provider:
+                stages.append((provider, []))
+            stages[-1][1].append((step_name, step_fn))
+        pools = {
+            provider: ThreadPoolExecutor(max_workers=max(1, self.workers[provider]), thread_name_prefix=f"geo-{provider}")
+            for provider, _ in stages
+        }
+        found: Dict[int, bool] = {}
+        lock = threading.Lock()
+        all_done = threading.Event()
+
+        def finish(index: int, ok: bool) -> None:
+            with lock:
+                found[index] = ok
+                if len(found) == len(locations):
+                    all_done.set()
+
+        def run(index: int, loc: Dict, stage: int) -> None:
+            provider, steps = stages[stage]
+            for step_name, step_fn in steps:
+                try:
+                    coords = step_fn(loc)
+                except Exception:
+                    coords = None
                 if coords:
                     lat, lon = coords
                     loc["coordinates"] = {
@@ -171,14 +241,26 @@ class GeocodingSystem:
                         "longitude": lon,
                         "method": step_name,
                     }
-                    self.resolved.append(loc)
+                    finish(index, True)
+                    return
+            if stage + 1 < len(stages):
+                pools[stages[stage + 1][0]].submit(run, index, loc, stage + 1)
+            else:
+                finish(index, False)
+
+        try:
+            for index, loc in enumerate(locations):
+                if loc.get("coordinates"):
+                    finish(index, True)
                 else:
-                    next_round.append(loc)
-                time.sleep(self.sleep)
-            candidates = next_round
-            if not candidates:
-                break  # hepsi bulundu
-        self.remaining = candidates
+                    pools[stages[0][0]].submit(run, index, loc, 0)
+            if locations:
+                all_done.wait()
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+        self.resolved = [loc for index, loc in enumerate(locations) if found[index]]
+        self.remaining = [loc for index, loc in enumerate(locations) if not found[index]]
 
     # ------------------------- Özet -------------------------------------- #
     def summary(self) -> Dict:
@@ -1,34 +1,47 @@
 """
 Coğrafi Kodlama Sistemi
 OpenStreetMap tabanlı lokasyon eşleştirme sistemi
+Sorgu sonuçları geocode_cache ile diskte saklanır; istekler aynı süreçteki geocoding_cli ile
+ortak sağlayıcı hız sınırlayıcılarından geçer (sabit bekleme yok, Retry-After'a uyulur)
 """
 
 import json
 import os
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
 from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from geopy.exc import GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable
 from rapidfuzz import fuzz
-import time
 from dotenv import load_dotenv
 
+from checkpoint import CheckpointLog, record_id
+from geocode_cache import GeocodeCache, Point, get_geocode_cache, location_point
+from rate_limit import PROVIDER_RATES, TokenBucket, limited_request, provider_limiter
+
 load_dotenv()
 
 class GeocodingSystem:
     """4 aşamalı coğrafi kodlama sistemi"""
     
-    def __init__(self):
+    def __init__(self, *, cache: Optional[GeocodeCache] = None, limiters: Optional[Dict[str, TokenBucket]] = None):
         self.nominatim = Nominatim(user_agent="web_scraper_geocoder")
         self.opencage_key = os.getenv("OPENCAGE_API_KEY")
         self.locationiq_key = os.getenv("LOCATIONIQ_API_KEY")
+        # None = paylaşılan önbellek (GEOCODE_CACHE), False = önbelleksiz
+        self.cache = get_geocode_cache() if cache is None else (cache or None)
+        # Sağlayıcı başına süreç genelinde paylaşılan hız sınırlayıcılar (rate_limit; ayrı süreçlerin bütçesi ayrıdır)
+        self.limiters = {provider: provider_limiter(provider) for provider in PROVIDER_RATES}
+        self.limiters.update(limiters or {})
         
-        # Sonuç dosyaları
+        # Sonuç dosyaları (save_results ile yazılan anlık görüntüler)
         self.resolved_file = "bulunanlar.json"
         self.remaining_file = "kalanlar.json"
+        # Her lokasyon bir aşamayı bitirdiğinde buraya tek satır eklenir
+        self.checkpoint = CheckpointLog("geocoding_checkpoint.jsonl")
         
-        # Mevcut sonuçları yükle
+        # Mevcut sonuçları yükle: eski JSON dosyaları + üzerine günlükteki ilerleme
         self.resolved_locations = self._load_json(self.resolved_file, [])
         self.remaining_locations = self._load_json(self.remaining_file, [])
+        self._restore()
     
     def _load_json(self, filename: str, default: List) -> List:
         """JSON dosyasını güvenli şekilde yükle"""
@@ -52,6 +65,49 @@ class GeocodingSystem:
         """Dosyaları güncelle"""
         self._save_json(self.resolved_file, self.resolved_locations)
         self._save_json(self.remaining_file, self.remaining_locations)
+
+    def save_results(self) -> None:
+        """Güncel durumu bulunanlar.json / kalanlar.json olarak dışa aktar"""
+        self._update_files()
+
+    def _restore(self) -> None:
+        """Kontrol noktası günlüğündeki en son durumu bellekteki listelere uygula"""
+        latest = self.checkpoint.latest()
+        if not latest:
+            return
+        # Dışa aktarılmış kayıtlar, günlükteki şehir/ülkelerle aynı kimliğe (_checkpoint_id) çevrilir
+        contexts = {(entry['city'], entry['country']) for entry in latest.values()}
+
+        def logged(location: Dict) -> bool:
+            return any(self._checkpoint_id(location, city, country) in latest for city, country in contexts)
+
+        resolved = [loc for loc in self.resolved_locations if not logged(loc)]
+        remaining = [loc for loc in self.remaining_locations if not logged(loc)]
+        for entry in latest.values():
+            location = entry['location']
+            (resolved if location.get('coordinates') else remaining).append(location)
+        self.resolved_locations = resolved
+        self.remaining_locations = remaining
+
+    def _geocode(self, provider: str, query: str, fetch: Callable[[], Optional[Point]]) -> Optional[Point]:
+        """Önbellekte varsa oradan, yoksa sağlayıcının hız sınırı içinde gerçek istekle"""
+        def request() -> Optional[Point]:
+            return limited_request(self.limiters[provider], fetch)
+
+        if self.cache is None:
+            return request()
+        return self.cache.lookup(provider, query, request)
+
+    @staticmethod
+    def _checkpoint_id(location: Dict, city: str, country: str) -> str:
+        """Aynı başlık farklı şehir/ülke veya içerikle başka bir kayıttır"""
+        return record_id({**location, 'city': city, 'country': country}, fields=('title', 'city', 'country', 'content'))
+
+    @staticmethod
+    def _notify(on_done: Optional[Callable[[Dict], None]], location: Dict) -> None:
+        """Yalnızca sağlayıcının kesin yanıtı (bulundu / bulunamadı) bildirilir; hatalar bildirilmez"""
+        if on_done is not None:
+            on_done(location)
     
     def load_locations_from_file(self, filename: str) -> List[Dict]:
         """Seçilen JSON dosyasından lokasyonları yükle"""
@@ -76,13 +132,14 @@ class GeocodingSystem:
             print(f"Dosya yüklenirken hata: {e}")
             return []
     
-    def stage1_nominatim_basic(self, locations: List[Dict], city: str = '', country: str = 'Türkiye') -> Tuple[List[Dict], List[Dict]]:
+    def stage1_nominatim_basic(self, locations: List[Dict], city: str = '', country: str = 'Türkiye', on_done: Optional[Callable[[Dict], None]] = None) -> Tuple[List[Dict], List[Dict]]:
         """Aşama 1: Nominatim ile temel sorgu"""
         resolved = []
         remaining = []
         for location in locations:
             if location.get('coordinates'):
                 resolved.append(location)
+                self._notify(on_done, location)
                 continue
             title = location['title']
             query = title
@@ -91,24 +148,26 @@ class GeocodingSystem:
             if country:
                 query += f", {country}"
             try:
-                result = self.nominatim.geocode(query, timeout=10)
-                if result:
+                point = self._geocode("nominatim", query, lambda: location_point(self.nominatim.geocode(query, timeout=10)))
+                if point:
                     location['coordinates'] = {
-                        'latitude': result.latitude,
-                        'longitude': result.longitude,
+                        'latitude': point[0],
+                        'longitude': point[1],
                         'method': 'nominatim_basic',
                         'query': query
                     }
                     resolved.append(location)
+                    self._notify(on_done, location)
                 else:
                     remaining.append(location)
-            except (GeocoderTimedOut, GeocoderUnavailable) as e:
+                    self._notify(on_done, location)
+            except (GeocoderTimedOut, GeocoderUnavailable, GeocoderRateLimited) as e:
+                # Geçici hata: günlüğe yazılmaz, sonraki çalıştırmada yeniden denenir
                 print(f"Nominatim hatası ({title}): {e}")
                 remaining.append(location)
-            time.sleep(1)
         return resolved, remaining
 
-    def stage2_enhanced_queries(self, locations: List[Dict], city: str = '', country: str = 'Türkiye') -> Tuple[List[Dict], List[Dict]]:
+    def stage2_enhanced_queries(self, locations: List[Dict], city: str = '', country: str = 'Türkiye', on_done: Optional[Callable[[Dict], None]] = None) -> Tuple[List[Dict], List[Dict]]:
         """Aşama 2: Geliştirilmiş lokasyon sorguları"""
         resolved = []
         remaining = []
@@ -122,6 +181,7 @@ class GeocodingSystem:
         for location in locations:
             if location.get('coordinates'):
                 resolved.append(location)
+                self._notify(on_done, location)
                 continue
             title = location['title']
             queries = []
@@ -140,29 +200,33 @@ class GeocodingSystem:
                     queries.append(f"{title}, {tcity}, {country}")
                     break
             resolved_location = None
+            failed = False
             for query in queries:
                 try:
-                    result = self.nominatim.geocode(query, timeout=10)
-                    if result:
+                    point = self._geocode("nominatim", query, lambda: location_point(self.nominatim.geocode(query, timeout=10)))
+                    if point:
                         location['coordinates'] = {
-                            'latitude': result.latitude,
-                            'longitude': result.longitude,
+                            'latitude': point[0],
+                            'longitude': point[1],
                             'method': 'enhanced_queries',
                             'query': query
                         }
                         resolved_location = location
                         break
-                except (GeocoderTimedOut, GeocoderUnavailable) as e:
+                except (GeocoderTimedOut, GeocoderUnavailable, GeocoderRateLimited) as e:
                     print(f"Geliştirilmiş sorgu hatası ({title}): {e}")
+                    failed = True
                     continue
-                time.sleep(1)
             if resolved_location:
                 resolved.append(resolved_location)
+                self._notify(on_done, location)
             else:
                 remaining.append(location)
+                if not failed:  # bir sorgu hata verdiyse "bulunamadı" kesin değil; yeniden denenecek
+                    self._notify(on_done, location)
         return resolved, remaining
 
-    def stage2_photon(self, locations: List[Dict], city: str = '', country: str = 'Türkiye') -> Tuple[List[Dict], List[Dict]]:
+    def stage2_photon(self, locations: List[Dict], city: str = '', country: str = 'Türkiye', on_done: Optional[Callable[[Dict], None]] = None) -> Tuple[List[Dict], List[Dict]]:
         """Aşama 2: Photon (OpenStreetMap) ile gelişmiş sorgu varyasyonları"""
         from geopy.geocoders import Photon
         resolved = []
@@ -171,6 +235,7 @@ class GeocodingSystem:
         for location in locations:
             if location.get('coordinates'):
                 resolved.append(location)
+                self._notify(on_done, location)
                 continue
             title = location['title']
             queries = []
@@ -185,13 +250,14 @@ class GeocodingSystem:
                 f"{title}"
             ]
             resolved_location = None
+            failed = False
             for query in queries:
                 try:
-                    result = geolocator.geocode(query, timeout=10)
-                    if result:
+                    point = self._geocode("photon", query, lambda: location_point(geolocator.geocode(query, timeout=10)))
+                    if point:
                         location['coordinates'] = {
-                            'latitude': result.latitude,
-                            'longitude': result.longitude,
+                            'latitude': point[0],
+                            'longitude': point[1],
                             'method': 'photon',
                             'query': query
                         }
@@ -199,15 +265,18 @@ class GeocodingSystem:
                         break
                 except Exception as e:
                     print(f"Photon hatası ({title}): {e}")
+                    failed = True
                     continue
-                time.sleep(1)
             if resolved_location:
                 resolved.append(resolved_location)
+                self._notify(on_done, location)
             else:
                 remaining.append(location)
+                if not failed:  # bir sorgu hata verdiyse "bulunamadı" kesin değil; yeniden denenecek
+                    self._notify(on_done, location)
         return resolved, remaining
 
-    def stage3_opencage_api(self, locations: List[Dict], city: str = '', country: str = 'Türkiye') -> Tuple[List[Dict], List[Dict]]:
+    def stage3_opencage_api(self, locations: List[Dict], city: str = '', country: str = 'Türkiye', on_done: Optional[Callable[[Dict], None]] = None) -> Tuple[List[Dict], List[Dict]]:
         """Aşama 3: OpenCage API kullanımı"""
         if not self.opencage_key:
             print("OpenCage API anahtarı bulunamadı!")
@@ -230,36 +299,60 @@ class GeocodingSystem:
             if country:
                 query += f", {country}"
             try:
-                results = geocoder.geocode(query, countrycode='tr')
-                if results:
-                    result = results[0]
+                point = self._geocode("opencage", query, lambda: self._opencage_point(geocoder, query))
+                if point:
                     location['coordinates'] = {
-                        'latitude': result['geometry']['lat'],
-                        'longitude': result['geometry']['lng'],
+                        'latitude': point[0],
+                        'longitude': point[1],
                         'method': 'opencage_api',
                         'query': query
                     }
                     resolved.append(location)
+                    self._notify(on_done, location)
                 else:
                     remaining.append(location)
+                    self._notify(on_done, location)
             except Exception as e:
+                # Geçici hata: günlüğe yazılmaz, sonraki çalıştırmada yeniden denenir
                 print(f"OpenCage hatası ({title}): {e}")
                 remaining.append(location)
-            time.sleep(1)
         return resolved, remaining
 
+    @staticmethod
+    def _opencage_point(geocoder, query: str) -> Optional[Point]:
+        results = geocoder.geocode(query, countrycode='tr')
+        if results:
+            return results[0]['geometry']['lat'], results[0]['geometry']['lng']
+        return None
+
     def stage4_manual_input(self, locations: List[Dict], city: str = '', country: str = 'Türkiye') -> Tuple[List[Dict], List[Dict]]:
         return [], locations
 
     def process_stage(self, stage: int, locations: List[Dict], city: str = '', country: str = 'Türkiye') -> Dict:
-        if stage == 1:
-            resolved, remaining = self.stage1_nominatim_basic(locations, city, country)
-        elif stage == 2:
-            resolved, remaining = self.stage2_enhanced_queries(locations, city, country)
-        elif stage == 3:
-            resolved, remaining = self.stage3_opencage_api(locations, city, country)
-        elif stage == 4:
+        stages = {
+            1: self.stage1_nominatim_basic,
+            2: self.stage2_enhanced_queries,
+            3: self.stage3_opencage_api,
+        }
+        if stage == 4:
             resolved, remaining = self.stage4_manual_input(locations, city, country)
+        elif stage in stages:
+            # Bu aşamayı daha önce (ör. çökmeden önce) bitirmiş lokasyonlar yeniden sorgulanmaz
+            tag = f"stage{stage}"
+            done = self.checkpoint.completed(tag)
+            ids = [self._checkpoint_id(loc, city, country) for loc in locations]
+            finished = [done[rid]['location'] for rid in ids if rid in done]
+            resolved = [loc for loc in finished if loc.get('coordinates')]
+            remaining = [loc for loc in finished if not loc.get('coordinates')]
+            pending = [loc for loc, rid in zip(locations, ids) if rid not in done]
+            new_resolved, new_remaining = stages[stage](
+                pending, city, country,
+                on_done=lambda loc: self.checkpoint.append(
+                    self._checkpoint_id(loc, city, country), tag, {'city': city, 'country': country, 'location': loc}
+                )
+            )
+            resolved += new_resolved
+            remaining += new_remaining
         else:
             return {"error": "Geçersiz aşama numarası"}
         # --- Accumulate all found locations across stages ---
@@ -270,7 +363,8 @@ class GeocodingSystem:
                 prev_resolved[loc['title']] = loc
         self.resolved_locations = list(prev_resolved.values())
         self.remaining_locations = remaining
-        self._update_files()
+        # Records are checkpointed one by one; the JSON exports are written once per stage
+        self.save_results()
         return {
             "resolved_count": len(resolved),
             "remaining_count": len(remaining),
@@ -292,4 +386,5 @@ class GeocodingSystem:
         """İlerlemeyi sıfırla"""
         self.resolved_locations = []
         self.remaining_locations = []
+        self.checkpoint.clear()
         self._update_files() 
\ No newline at end of file
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Etiket önbelleği
+Gemini etiketlerini (model, istem şablonu, normalize metin) özetine göre SQLite'ta
+saklar; aynı içerik yeniden etiketlenirken API'ye gidilmez.
+
+• İstem şablonu veya model değişirse anahtar da değişir: eski kayıtlar kullanılmaz,
+  purge() ile silinebilir
+• Hit/miss sayaçları stats() ile okunur (bağlantı ve sayaçlar: sqlite_cache.SQLiteCache)
+• GEMINI_LABEL_CACHE=off önbelleği kapatır, GEMINI_LABEL_CACHE_REFRESH=1 mevcut
+  kayıtları okumadan yeniden etiketletip üzerine yazar
+
+Kullanım örneği:
+    python label_cache.py              # kayıt sayısı
+    python label_cache.py --purge      # güncel istem şablonlarına ait olmayan kayıtları sil
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from typing import List, Optional
+
+from sqlite_cache import Shared, SQLiteCache, run_cli
+
+LABEL_CACHE_PATH = os.getenv("GEMINI_LABEL_CACHE", "label_cache.sqlite3")
+LABEL_CACHE_REFRESH = os.getenv("GEMINI_LABEL_CACHE_REFRESH", "").lower() in ("1", "true", "yes")
+
+
+def normalize_text(text: str) -> str:
+    """NFC form with whitespace runs collapsed, so formatting-only changes still hit."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def template_hash(template: str) -> str:
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+class LabelCache(SQLiteCache):
+    """
+    SQLite-backed label cache, keyed by sha256(model, prompt template, normalized text).
+    - One connection per thread (WAL mode), so concurrent labeling workers can share it.
+    - `refresh=True` skips reads (every lookup is a miss) but still stores new labels.
+    """
+
+    def __init__(self, path: str = LABEL_CACHE_PATH, refresh: bool = LABEL_CACHE_REFRESH):
+        super().__init__(
+            path,
+            "labels",
+            "CREATE TABLE IF NOT EXISTS labels ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " template TEXT NOT NULL,"
+            " labels TEXT NOT NULL,"
+            " created_at REAL NOT NULL)",
+        )
+        self.refresh = refresh
+
+    @staticmethod
+    def key(model: str, template: str, text: str) -> str:
+        payload = json.dumps([model, template_hash(template), normalize_text(text)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, template: str, text: str) -> Optional[List[str]]:
+        row = None
+        if not self.refresh:
+            row = self._connect().execute(
+                "SELECT labels FROM labels WHERE key = ?", (self.key(model, template, text),)
+            ).fetchone()
+        self._count(row is not None)
+        return json.loads(row[0]) if row else None
+
+    def put(self, model: str, template: str, text: str, labels: List[str]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO labels (key, model, template, labels, created_at) VALUES (?, ?, ?, ?, ?)",
+                (self.key(model, template, text), model, template_hash(template), json.dumps(labels, ensure_ascii=False), time.time()),
+            )
+
+    def purge(self, *keep_templates: str) -> int:
+        """
+        Deletes entries made with prompt templates other than `keep_templates` (all entries without any).
+        Returns the number of deleted entries.
+        """
+        hashes = [template_hash(template) for template in keep_templates]
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM labels WHERE template NOT IN ({', '.join('?' * len(hashes))})", hashes
+            )
+            return cursor.rowcount
+
+
+_shared = Shared(lambda: LABEL_CACHE_PATH, LabelCache)
+
+
+def get_label_cache() -> Optional[LabelCache]:
+    """
+    Returns the shared label cache, or None when GEMINI_LABEL_CACHE is "off"/empty.
+    """
+    return _shared.get()
+
+
+def _purge_old_templates(cache: LabelCache) -> int:  # pragma: no cover
+    from gemini_labeler import BATCH_PROMPT_TEMPLATE, PROMPT_TEMPLATE
+    return cache.purge(PROMPT_TEMPLATE, BATCH_PROMPT_TEMPLATE)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    run_cli(
+        "Gemini etiket önbelleği bakımı",
+        LABEL_CACHE_PATH,
+        LabelCache,
+        ("purge", "Güncel istem şablonlarına ait olmayan kayıtları sil", _purge_old_templates),
+    )
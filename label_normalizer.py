@@ -0,0 +1,181 @@
+"""
+Etiket normalizasyonu ve etiket dizini
+"Tarih", "tarihi", "Tarihî yer" gibi yazım farklarını tek bir kanonik etikete indirger;
+etiket → kayıt kimlikleri dizini ile filtreleme ve sayımlar yeniden tarama gerektirmez.
+
+• Türkçe küçük harf (İ→i, I→ı), şapka/aksan ve Türkçe harf katlama (ş→s, ı→i ...) ile anahtar
+• Önceden hesaplanmış eş anlamlı/kök sözlüğü (SYNONYMS); yalnızca çoğul/iyelik eki atılarak
+  sözlükteki bir köke ulaşılabiliyorsa o kök ("Müzeler" → müze; "Denizli" ise deniz değildir)
+• Sözlükte olmayan etiketler kendi normalize yazımlarıyla kalır (görülme sırasından bağımsız)
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+# Folded key -> canonical label
+SYNONYMS: Dict[str, str] = {
+    "tarih": "tarih", "tarihi": "tarih", "tarihsel": "tarih", "tarihi mekan": "tarih", "tarihi eser": "tarih",
+    "tarihi yapi": "tarih", "antik": "tarih", "antik kent": "tarih", "antik sehir": "tarih", "oren yeri": "tarih",
+    "muze": "müze", "muzeler": "müze", "muzesi": "müze",
+    "plaj": "plaj", "sahil": "plaj", "kumsal": "plaj",
+    "deniz": "deniz", "denizi": "deniz",
+    "doga": "doğa", "dogal": "doğa", "dogal guzellik": "doğa", "orman": "doğa", "yesil alan": "doğa", "park": "doğa",
+    "milli park": "doğa", "tabiat": "doğa",
+    "cami": "cami", "camii": "cami", "camisi": "cami",
+    "kilise": "kilise", "kilisesi": "kilise",
+    "dini": "dini yapı", "dini yapi": "dini yapı", "ibadet": "dini yapı",
+    "mimari": "mimari", "mimarlik": "mimari",
+    "kultur": "kültür", "kulturel": "kültür",
+    "sanat": "sanat", "sanatsal": "sanat", "galeri": "sanat",
+    "yemek": "yemek", "gastronomi": "yemek", "lezzet": "yemek", "mutfak": "yemek", "restoran": "yemek",
+    "alisveris": "alışveriş", "carsi": "alışveriş", "pazar": "alışveriş",
+    "manzara": "manzara", "seyir": "manzara", "seyir tepesi": "manzara",
+    "macera": "macera", "aktivite": "macera", "spor": "macera",
+    "eglence": "eğlence", "gece hayati": "eğlence",
+    "aile": "aile", "cocuk": "aile", "cocuklar": "aile",
+    "saray": "saray", "sarayi": "saray",
+    "kale": "kale", "kalesi": "kale",
+    "sehir": "şehir",
+}
+# Inflectional endings (plural, possessive) stripped to reach a SYNONYMS root, longest first
+# (already folded: ı→i, ü→u). Derivational ones such as -li are left out on purpose:
+# they form place names ("Denizli", "Camili") rather than spellings of the root.
+SUFFIXES = ("leri", "lari", "ler", "lar", "si", "su", "i", "u")
+# Generic trailing words: "tarihi yer" ~ "tarihi"
+GENERIC_WORDS = ("yer", "yerler", "yerleri", "mekan", "mekani", "alan", "alani", "bolge", "bolgesi", "nokta", "noktasi")
+
+
+def turkish_lower(text: str) -> str:
+    """Lowercases with Turkish dotted/dotless i rules (İ→i, I→ı)."""
+    return text.replace("İ", "i").replace("I", "ı").lower()
+
+
+_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u"})
+_NON_WORD = re.compile(r"[^\w\s]+")
+_CIRCUMFLEX = str.maketrans({"â": "a", "î": "i", "û": "u"})
+
+
+def fold_key(label: str) -> str:
+    """
+    Matching key: Turkish lowercase, accents (â, î, û) and Turkish letters folded, punctuation dropped.
+    """
+    text = turkish_lower(str(label)).translate(_FOLD)
+    text = "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def display_form(label: str) -> str:
+    """
+    Readable normalized spelling: Turkish lowercase with Turkish letters kept, circumflexes
+    (â, î, û) dropped, punctuation removed and whitespace collapsed.
+    """
+    text = unicodedata.normalize("NFC", turkish_lower(str(label)))
+    text = text.translate(_CIRCUMFLEX)
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+class LabelNormalizer:
+    """
+    Maps label spellings to canonical labels, remembering every mapping (dict lookups after the first).
+    - Known roots come from `synonyms` (folded key -> canonical label).
+    - Unknown labels are canonical in their own normalized spelling (see display_form), so the
+      result never depends on which labels were seen before.
+    """
+
+    def __init__(self, synonyms: Optional[Dict[str, str]] = None):
+        self.synonyms = dict(SYNONYMS if synonyms is None else synonyms)
+        self._canonical: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, key: str) -> Optional[str]:
+        if key in self.synonyms:
+            return self.synonyms[key]
+        words = key.split()
+        if len(words) > 1 and words[-1] in GENERIC_WORDS:
+            return self._resolve(" ".join(words[:-1]))
+        for suffix in SUFFIXES:
+            if key.endswith(suffix) and len(key) - len(suffix) >= 3 and key[: -len(suffix)] in self.synonyms:
+                return self.synonyms[key[: -len(suffix)]]
+        return None
+
+    def normalize(self, label: str) -> str:
+        canonical = self._canonical.get(label)
+        if canonical is not None:
+            return canonical
+        canonical = self._resolve(fold_key(label))
+        if canonical is None:
+            canonical = display_form(label)
+        with self._lock:
+            self._canonical[label] = canonical
+        return canonical
+
+    def normalize_all(self, labels: Iterable[str]) -> List[str]:
+        """Canonical labels in their original order, without duplicates or empty labels."""
+        result: List[str] = []
+        for label in labels:
+            canonical = self.normalize(label)
+            if canonical and canonical not in result:
+                result.append(canonical)
+        return result
+
+
+_default_normalizer = LabelNormalizer()
+
+
+def normalize_label(label: str) -> str:
+    return _default_normalizer.normalize(label)
+
+
+def normalize_labels(labels: Iterable[str]) -> List[str]:
+    return _default_normalizer.normalize_all(labels)
+
+
+class LabelIndex:
+    """
+    Canonical label -> ids of the records carrying it.
+    - Lookups normalize the queried label, so "Tarihî" finds records labeled "tarih".
+    - counts() gives label frequencies without rescanning the records.
+    """
+
+    def __init__(self, normalizer: Optional[LabelNormalizer] = None):
+        self.normalizer = normalizer or _default_normalizer
+        self._records: Dict[str, Set[Hashable]] = {}
+
+    @classmethod
+    def build(cls, records: Iterable[dict], normalizer: Optional[LabelNormalizer] = None) -> "LabelIndex":
+        """Indexes records by position (record id = index in `records`)."""
+        index = cls(normalizer)
+        for record_id, record in enumerate(records):
+            index.add(record_id, record.get("labels") or [])
+        return index
+
+    def add(self, record_id: Hashable, labels: Iterable[str]) -> None:
+        for label in self.normalizer.normalize_all(labels):
+            self._records.setdefault(label, set()).add(record_id)
+
+    def records_for(self, label: str) -> Set[Hashable]:
+        return self._records.get(self.normalizer.normalize(label), set())
+
+    def records_for_all(self, labels: Iterable[str]) -> Set[Hashable]:
+        """Ids of the records carrying every one of `labels`."""
+        sets = sorted((self.records_for(label) for label in labels), key=len)
+        if not sets:
+            return set()
+        return set.intersection(*sets) if len(sets) > 1 else set(sets[0])
+
+    def counts(self) -> Counter:
+        return Counter({label: len(ids) for label, ids in self._records.items()})
+
+    def labels(self) -> List[str]:
+        return sorted(self._records)
+
+    def __contains__(self, label: str) -> bool:
+        return bool(self.records_for(label))
+
+    def __len__(self) -> int:
+        return len(self._records)
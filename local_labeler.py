@@ -0,0 +1,162 @@
+"""
+Yerel etiketleyici
+Önceki etiketli çıktılardan (labeled_output.json vb.) öğrenilen TF-IDF vektörleriyle
+kolay metinleri Gemini'ye gitmeden etiketler; emin olunamayanlar LLM'e bırakılır.
+
+• Metin → Türkçe küçük harf, noktalama temizliği, kök yerine ilk 5 harf (kaba lemma)
+• Her etiket için eğitim metinlerinin ortalama TF-IDF vektörü (merkez) tutulur
+• Yeni metnin merkezlere kosinüs benzerliği eşik değerini geçiyorsa etiket verilir
+• Tüm hesaplar NumPy matris çarpımlarıyla topluca yapılır
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from label_normalizer import normalize_labels, turkish_lower
+from sqlite_cache import is_disabled
+
+# Comma-separated files/globs of Gemini-labeled outputs to learn from. Opt-in ("off" by default):
+# pointing it at labeled_output.json while local labeling is on would train on its own predictions.
+LOCAL_LABELER_DATA = os.getenv("LOCAL_LABELER_DATA", "off")
+# Minimum cosine similarity for a label to be assigned locally
+LOCAL_LABELER_THRESHOLD = float(os.getenv("LOCAL_LABELER_THRESHOLD", "0.35"))
+# Fewer labeled records than this and the local labeler is not used
+MIN_TRAINING_RECORDS = 20
+
+STEM_LENGTH = 5
+STOPWORDS = frozenset(
+    "ve ile bir bu şu o da de için gibi çok daha en ama veya ya ki mi mı mu mü olan olarak "
+    "kadar sonra önce her hem ise değil var yok ayrıca ancak the and of to in".split()
+)
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word stems (first STEM_LENGTH letters), without stopwords and very short words.
+    """
+    return [word[:STEM_LENGTH] for word in _WORD.findall(turkish_lower(text)) if len(word) > 2 and word not in STOPWORDS]
+
+
+class LocalLabeler:
+    """
+    Nearest-centroid TF-IDF labeler.
+    - fit(texts, labels) learns the vocabulary, IDF weights and one centroid per label.
+    - predict(texts) returns (labels, confidence) per text; labels is empty when no label
+      reaches `threshold`, meaning the text should go to the LLM.
+    """
+
+    def __init__(self, threshold: float = LOCAL_LABELER_THRESHOLD, max_labels: int = 3, min_df: int = 2, min_label_count: int = 3):
+        self.threshold = threshold
+        self.max_labels = max_labels
+        self.min_df = min_df
+        self.min_label_count = min_label_count
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0)
+        self.labels: List[str] = []
+        self.centroids = np.zeros((0, 0))
+
+    def _vectorize(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token, count in Counter(tokenize(text)).items():
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    matrix[row, column] = count
+        matrix = np.log1p(matrix) * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def fit(self, texts: Sequence[str], labels: Sequence[Sequence[str]]) -> "LocalLabeler":
+        df = Counter(token for text in texts for token in set(tokenize(text)))
+        self.vocabulary = {token: i for i, token in enumerate(sorted(t for t, n in df.items() if n >= self.min_df))}
+        self.idf = np.array(
+            [np.log((1 + len(texts)) / (1 + df[token])) + 1 for token in self.vocabulary], dtype=np.float32
+        )
+        label_counts = Counter(label for item_labels in labels for label in set(item_labels))
+        self.labels = sorted(label for label, n in label_counts.items() if n >= self.min_label_count)
+        index = {label: i for i, label in enumerate(self.labels)}
+        vectors = self._vectorize(texts)
+        membership = np.zeros((len(self.labels), len(texts)), dtype=np.float32)
+        for column, item_labels in enumerate(labels):
+            for label in set(item_labels):
+                if label in index:
+                    membership[index[label], column] = 1
+        centroids = membership @ vectors
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids / np.where(norms == 0, 1, norms)
+        return self
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of every text (rows) to every label centroid (columns)."""
+        if not self.labels or not texts:
+            return np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        return self._vectorize(texts) @ self.centroids.T
+
+    def predict(self, texts: Sequence[str], threshold: Optional[float] = None) -> List[Tuple[List[str], float]]:
+        threshold = self.threshold if threshold is None else threshold
+        scores = self.scores(texts)
+        results = []
+        for row in scores:
+            order = np.argsort(-row)[: self.max_labels]
+            chosen = [self.labels[i] for i in order if row[i] >= threshold]
+            results.append((chosen, float(row[order[0]]) if len(order) else 0.0))
+        return results
+
+
+def load_training_records(patterns: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Reads labeled records (with "content" and a non-empty "labels" list) from JSON array files.
+    """
+    records = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern.strip())):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            records.extend(
+                item for item in data
+                if isinstance(item, dict) and item.get("content") and isinstance(item.get("labels"), list) and item["labels"]
+            )
+    return records
+
+
+def train_from_files(patterns: Iterable[str], threshold: float = LOCAL_LABELER_THRESHOLD) -> Optional[LocalLabeler]:
+    records = load_training_records(patterns)
+    if len(records) < MIN_TRAINING_RECORDS:
+        return None
+    labeler = LocalLabeler(threshold=threshold).fit(
+        [item["content"] for item in records], [normalize_labels(str(label) for label in item["labels"]) for item in records]
+    )
+    return labeler if labeler.labels else None
+
+
+_default_labeler: Optional[LocalLabeler] = None
+_default_loaded = False
+_default_lock = threading.Lock()
+
+
+def get_local_labeler() -> Optional[LocalLabeler]:
+    """
+    Returns the shared local labeler trained on LOCAL_LABELER_DATA, or None when it is
+    disabled (the default) or there is not enough labeled data yet.
+    """
+    global _default_labeler, _default_loaded
+    if is_disabled(LOCAL_LABELER_DATA):
+        return None
+    with _default_lock:
+        if not _default_loaded:
+            _default_labeler = train_from_files(LOCAL_LABELER_DATA.split(","))
+            _default_loaded = True
+        return _default_labeler
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+pipeline.py  –  Tarayıcısız uçtan uca akış: getir → ayrıştır → etiketle → koordinatla
+
+• URL listesini scrapingbee_cache ile getirir (önbellekte olanlar ağa çıkmaz)
+• Her sayfadaki destinasyonları parse_destinations ile çıkarır
+• Her kaydı Gemini ile etiketler ve GeocodingSystem.resolve ile koordinatlar
+• Aşamalar sınırlı kuyruklarla bağlı eşzamanlı iş parçacıklarıdır; yavaş bir aşama
+  öncekileri bekletir, bellek kullanımı kuyruk boyutlarıyla sınırlı kalır
+• Sonuçlar tek bir JSONL akışına, hazır oldukça yazılır; hatalı kayıtlar
+  "error" ve "stage" alanlarıyla yazılır, akışı durdurmaz
+
+Kullanım örneği:
+    python pipeline.py --urls urls.txt --out results.jsonl --city İstanbul
+    cat urls.txt | python pipeline.py --urls - --label-workers 4 --out -
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from ScrapingBee.scrapingbee_cache import get_html_many
+from destination_parser import parse_destinations
+
+Record = Dict[str, Any]
+
+# Kuyruk sonu işareti
+_DONE = object()
+
+
+class _Stage:
+    """
+    Worker threads that read items from `inbox`, apply `fn` and put every item it
+    returns on `outbox`. Records that fail are sent straight to `errors`.
+    The last worker to finish forwards the end marker downstream.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Record], Iterable[Record]], inbox: "queue.Queue", outbox: "queue.Queue",
+                 errors: "queue.Queue", workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.errors = errors
+        self._running = workers
+        self._lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+
+    def start(self) -> None:
+        for thread in self.threads:
+            thread.start()
+
+    def _work(self) -> None:
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                self.inbox.put(_DONE)  # diğer işçiler de görsün
+                break
+            try:
+                for result in self.fn(item):
+                    self.outbox.put(result)
+            except Exception as e:  # kayıt hatayla işaretlenip çıktıya geçer
+                self.errors.put({**item, "stage": self.name, "error": f"{type(e).__name__}: {e}"})
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            self.outbox.put(_DONE)
+
+
+def default_labeler() -> Callable[[str], List[str]]:
+    """
+    gemini_labeler.label_text: every label worker draws from the shared GEMINI_RPM / GEMINI_TPM
+    quota, and a failed request raises so the record is written with stage "label".
+    """
+    from gemini_labeler import label_text
+    return label_text
+
+
+def default_geocoder(city: str = "", country: str = "Türkiye", district: str = "") -> Callable[[Record], Optional[Dict]]:
+    """
+    Returns a function that geocodes one record with geocoding_cli.GeocodingSystem.
+    Each worker thread gets its own GeocodingSystem (resolve keeps per-call state).
+    """
+    from geocoding_cli import GeocodingSystem
+
+    local = threading.local()
+
+    def geocode(record: Record) -> Optional[Dict]:
+        geo = getattr(local, "geo", None)
+        if geo is None:
+            geo = local.geo = GeocodingSystem()
+        loc = {"title": record["title"], "content": record.get("content", ""), "labels": record.get("labels", []), "coordinates": None}
+        geo.resolve([loc], city=city, country=country, district=district)
+        return loc["coordinates"]
+
+    return geocode
+
+
+def run_pipeline(
+    urls: Iterable[str],
+    out: TextIO,
+    *,
+    fetch: Optional[Callable[[List[str]], Iterable[Tuple[str, Optional[str], Optional[Exception]]]]] = None,
+    parse: Callable[..., List[Dict[str, str]]] = parse_destinations,
+    label: Optional[Callable[[str], List[str]]] = None,
+    geocode: Optional[Callable[[Record], Optional[Dict]]] = None,
+    fetch_concurrency: int = 8,
+    parse_workers: int = 1,
+    label_workers: int = 2,
+    geocode_workers: int = 1,
+    queue_size: int = 64,
+) -> Dict[str, int]:
+    """
+    Streams URLs through fetch → parse → label → geocode and writes one JSON line per
+    destination record: {"url", "title", "content", "labels", "coordinates"}.
+    - `fetch(urls)` yields (url, html, error); the default uses get_html_many.
+    - `label=None` / `geocode=None` use Gemini / GeocodingSystem; pass False to skip a stage.
+    - Failed pages/records are written with "stage" and "error" fields.
+    - Returns written record and error counts.
+    """
+    if fetch is None:
+        fetch = lambda batch: ((r.url, r.html, r.error) for r in get_html_many(batch, concurrency=fetch_concurrency))
+    if label is None:
+        label = default_labeler()
+    if geocode is None:
+        geocode = default_geocoder()
+
+    pages: "queue.Queue" = queue.Queue(queue_size)
+    to_label: "queue.Queue" = queue.Queue(queue_size)
+    to_geocode: "queue.Queue" = queue.Queue(queue_size)
+    results: "queue.Queue" = queue.Queue(queue_size)
+
+    def parse_page(page: Record) -> Iterator[Record]:
+        for destination in parse(page.pop("html"), url=page["url"]):
+            yield {"url": page["url"], **destination, "labels": [], "coordinates": None}
+
+    def label_record(record: Record) -> Iterator[Record]:
+        if label and record.get("content"):
+            record["labels"] = label(record["content"])
+        yield record
+
+    def geocode_record(record: Record) -> Iterator[Record]:
+        if geocode:
+            record["coordinates"] = geocode(record)
+        yield record
+
+    stages = [
+        _Stage("parse", parse_page, pages, to_label, results, parse_workers),
+        _Stage("label", label_record, to_label, to_geocode, results, label_workers),
+        _Stage("geocode", geocode_record, to_geocode, results, results, geocode_workers),
+    ]
+    for stage in stages:
+        stage.start()
+
+    def feed() -> None:
+        try:
+            for url, html, error in fetch(list(dict.fromkeys(urls))):
+                if error is not None:
+                    results.put({"url": url, "stage": "fetch", "error": f"{type(error).__name__}: {error}"})
+                else:
+                    pages.put({"url": url, "html": html})
+        except Exception as e:  # ör. eksik API anahtarı: tüm akış durur ama hata yazılır
+            results.put({"url": None, "stage": "fetch", "error": f"{type(e).__name__}: {e}"})
+        finally:
+            pages.put(_DONE)
+
+    threading.Thread(target=feed, name="fetch", daemon=True).start()
+
+    counts = {"records": 0, "errors": 0}
+    while True:
+        record = results.get()
+        if record is _DONE:
+            break
+        counts["errors" if "error" in record else "records"] += 1
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+    return counts
+
+
+def _read_urls(path: str) -> List[str]:
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _cli() -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description="URL listesini getir, ayrıştır, etiketle ve koordinatla (JSONL çıktı)")
+    p.add_argument("--urls", required=True, help="Satır başına bir URL içeren dosya ('-' = stdin)")
+    p.add_argument("--out", default="pipeline_output.jsonl", help="JSONL çıktı dosyası ('-' = stdout)")
+    p.add_argument("--city", default="", help="Koordinatlama için varsayılan şehir")
+    p.add_argument("--country", default="Türkiye", help="Varsayılan ülke")
+    p.add_argument("--district", default="", help="Varsayılan semt/ilçe (opsiyonel)")
+    p.add_argument("--fetch-concurrency", type=int, default=8, help="Eşzamanlı ScrapingBee isteği")
+    p.add_argument("--parse-workers", type=int, default=1)
+    p.add_argument("--label-workers", type=int, default=2)
+    p.add_argument("--geocode-workers", type=int, default=1, help="Nominatim kullanım koşulları için 1 önerilir")
+    p.add_argument("--queue-size", type=int, default=64, help="Aşamalar arası kuyruk kapasitesi")
+    p.add_argument("--no-label", action="store_true", help="Etiketleme aşamasını atla")
+    p.add_argument("--no-geocode", action="store_true", help="Koordinatlama aşamasını atla")
+    args = p.parse_args()
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        counts = run_pipeline(
+            _read_urls(args.urls),
+            out,
+            label=False if args.no_label else None,
+            geocode=False if args.no_geocode else default_geocoder(args.city, args.country, args.district),
+            fetch_concurrency=args.fetch_concurrency,
+            parse_workers=args.parse_workers,
+            label_workers=args.label_workers,
+            geocode_workers=args.geocode_workers,
+            queue_size=args.queue_size,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Kayıt: {counts['records']}, hata: {counts['errors']}, süre: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _cli()
@@ -0,0 +1,153 @@
+"""
+Hız sınırlayıcı (token bucket)
+API kotalarına (istek/dakika, token/dakika) uymak için iş parçacıkları arasında
+paylaşılabilen kova tabanlı sınırlayıcı.
+
+• Kova saniyede `rate` token dolar, en fazla `capacity` token biriktirir
+• acquire() yalnızca gerektiği kadar bekler; bekleyenler geliş sırasıyla geçer
+• Saat ve uyku fonksiyonu dışarıdan verilebilir (testlerde sahte saat)
+• Coğrafi kodlama sağlayıcıları için süreç genelinde paylaşılan kovalar (provider_limiter)
+  ve 429 / Retry-After'a uyan istek sarmalayıcısı (limited_request)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+# ------------------------------------------------------------
+# Opsiyonel: geopy (hız sınırı hatası 429 + retry_after)
+try:
+    from geopy.exc import GeocoderRateLimited  # type: ignore
+except ImportError:  # kitaplık yoksa limited_request yeniden denemez
+    GeocoderRateLimited = None
+
+load_dotenv()
+
+# Sağlayıcı başına istek/saniye (NOMINATIM_RPS, PHOTON_RPS, OPENCAGE_RPS)
+# (Nominatim politikası: en fazla 1 istek/sn; OpenCage ücretsiz katman: 1 istek/sn)
+PROVIDER_RATES: Dict[str, float] = {
+    "nominatim": float(os.getenv("NOMINATIM_RPS", "1")),
+    "photon": float(os.getenv("PHOTON_RPS", "2")),
+    "opencage": float(os.getenv("OPENCAGE_RPS", "1")),
+}
+# 429 yanıtından sonra yeniden deneme sayısı, Retry-After yoksa ilk bekleme ve kabul edilen en uzun bekleme (sn)
+RATE_LIMIT_RETRIES = int(os.getenv("GEOCODE_RATE_LIMIT_RETRIES", "3"))
+RATE_LIMIT_BACKOFF = 5.0
+MAX_RETRY_AFTER = float(os.getenv("GEOCODE_MAX_RETRY_AFTER", "120"))
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    - `rate`: tokens added per second; `capacity`: burst size (default: one second's worth, at least 1).
+    - acquire(n) reserves n tokens and sleeps until they are available; requests larger
+      than the capacity are allowed and simply wait longer.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, rate) if capacity is None else capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._available = self.capacity
+        self._updated = clock()
+
+    @classmethod
+    def per_minute(cls, count: float, burst: Optional[float] = None, **kwargs) -> "TokenBucket":
+        """
+        Bucket for a per-minute quota; the burst defaults to a tenth of it (at least 1).
+        """
+        return cls(count / 60.0, max(1.0, count / 10.0) if burst is None else burst, **kwargs)
+
+    def _refill(self, now: float) -> None:
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes `tokens` from the bucket (possibly into debt) and returns the seconds to wait before using them.
+        """
+        with self._lock:
+            self._refill(self.clock())
+            self._available -= tokens
+            return max(0.0, -self._available / self.rate)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Blocks until `tokens` are available and returns the time waited.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            self._refill(self.clock())
+            if self._available < tokens:
+                return False
+            self._available -= tokens
+            return True
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds back all callers for at least `seconds` from now (e.g. after a quota error).
+        """
+        with self._lock:
+            self._refill(self.clock())
+            self._available = min(self._available, -seconds * self.rate)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def provider_limiter(provider: str) -> TokenBucket:
+    """
+    Returns the process-wide limiter of a provider, so every GeocodingSystem in this
+    process (e.g. all pipeline workers) shares one request budget. Other processes,
+    such as the CLI started by Streamlit, have their own full budget.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = TokenBucket(PROVIDER_RATES[provider], capacity=1)
+        return _limiters[provider]
+
+
+def limited_request(limiter: TokenBucket, fetch: Callable[[], T], retries: int = RATE_LIMIT_RETRIES) -> T:
+    """
+    Calls `fetch` once `limiter` allows another request.
+    - A rate-limit answer (geopy's GeocoderRateLimited, 429) pauses the limiter, and with it every
+      worker on that endpoint, for the server's Retry-After (or an exponential backoff without one),
+      then retries.
+    - After `retries` attempts, or when asked to wait longer than MAX_RETRY_AFTER, the error is raised.
+    """
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            return fetch()
+        except Exception as e:
+            if GeocoderRateLimited is None or not isinstance(e, GeocoderRateLimited):
+                raise
+            delay = e.retry_after if e.retry_after is not None else RATE_LIMIT_BACKOFF * 2 ** attempt
+            if attempt >= retries or delay > MAX_RETRY_AFTER:
+                raise
+            limiter.pause(delay)
+            attempt += 1
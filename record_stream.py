@@ -0,0 +1,131 @@
+"""
+Kayıt akışı
+Büyük JSON/JSONL dosyalarını tamamını belleğe almadan kayıt kayıt okur.
+
+• .jsonl / .ndjson: satır başına bir JSON nesnesi; yazarken çökmeden kalan yarım son satır atlanır
+• .json: en üstte bir JSON dizisi; öğeler dosya parça parça okunarak ayrıştırılır
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Iterator, TextIO
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array one by one, reading `chunk_size`
+    characters at a time; only the current element is held in memory.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_space() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip_space()
+    if pos >= len(buffer) or buffer[pos] != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    skip_space()
+    if pos < len(buffer) and buffer[pos] == "]":
+        return
+    while True:
+        skip_space()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    break
+            except ValueError:
+                if eof:
+                    raise
+            if not fill():
+                value, end = _decoder.raw_decode(buffer, pos)
+                break
+        pos = end
+        yield value
+        skip_space()
+        if pos >= len(buffer):
+            raise ValueError("Unterminated JSON array")
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos]!r}")
+        pos += 1
+
+
+def iter_records(path: str) -> Iterator[Any]:
+    """
+    Streams the records of a JSONL file, or the elements of a JSON array file.
+    A JSONL last line that has no newline and does not parse (a write cut short) is skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if line.endswith("\n"):
+                        raise
+                    return
+                yield record
+        else:
+            yield from iter_json_array(f)
+
+
+def repair_jsonl_tail(path: str, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Makes a JSONL file safe to append to after a crash mid-write: a last line without a newline
+    is cut off when it is not valid JSON, or terminated with a newline when it is.
+    """
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        start = end
+        tail = b""
+        while start > 0:
+            step = min(chunk_size, start)
+            start -= step
+            f.seek(start)
+            tail = f.read(step) + tail
+            newline = tail.rfind(b"\n")
+            if newline >= 0:
+                start += newline + 1
+                tail = tail[newline + 1:]
+                break
+        try:
+            json.loads(tail)
+        except ValueError:
+            f.truncate(start)
+        else:
+            f.seek(0, os.SEEK_END)
+            f.write(b"\n")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+reparse_cache.py  –  HTML önbelleğinin tamamını yeniden ayrıştırma
+
+• scrapingbee_cache deposundaki (filesystem / sqlite / lmdb) her sayfayı
+  süreç havuzunda parse_destinations ile yeniden işler
+• Sonuçları JSONL olarak satır satır, bittikçe yazar; hatalı sayfalar işi durdurmaz,
+  hata mesajıyla birlikte kendi satırına yazılır
+• İlerleme ve hız (sayfa/s, MB/s) stderr'e düzenli olarak raporlanır
+
+Kullanım örneği:
+    python reparse_cache.py --out destinations.jsonl
+    python reparse_cache.py --cache-dir cache --backend sqlite --workers 8 --out - > out.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from ScrapingBee.scrapingbee_cache import HTMLCache
+from ScrapingBee.scrapingbee_cache.backends import BACKENDS, open_backend
+from ScrapingBee.scrapingbee_cache.compression import decompress
+from destination_parser import parse_destinations
+
+# Her işçi sürecinin kendi açtığı depo (bağlantılar süreçler arasında paylaşılamaz)
+_worker_backend = None
+
+
+def _store_location(html_cache: HTMLCache) -> Tuple[str, str, str]:
+    backend = html_cache.backend
+    return backend.name, html_cache.cache_dir, getattr(backend, "root", None) or backend.path
+
+
+def _init_worker(name: str, cache_dir: str, path: str) -> None:
+    global _worker_backend
+    _worker_backend = open_backend(name, cache_dir, path)
+
+
+def _parse_entry(entry: Tuple[str, str]) -> Dict[str, Any]:
+    key, url = entry
+    record: Dict[str, Any] = {"url": url, "key": key, "bytes": 0}
+    try:
+        blob = _worker_backend.read(key)
+        if blob is None:
+            raise FileNotFoundError(f"Önbellek girdisi bulunamadı: {key}")
+        raw = decompress(blob)
+        record["bytes"] = len(raw)
+        html = raw.decode("utf-8")
+        record["destinations"] = parse_destinations(html, url=url)
+    except Exception as e:  # hata kaydedilir, iş devam eder
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def iter_entries(html_cache: HTMLCache) -> List[Tuple[str, str]]:
+    """
+    Returns (key, url) for every entry in the store that records its URL.
+    Entries still in the old flat layout have no URL; run migrate_legacy first.
+    """
+    return [(key, meta["url"]) for key, meta in html_cache.backend.iter_meta() if meta.get("url")]
+
+
+def reparse(
+    html_cache: HTMLCache,
+    out: TextIO,
+    workers: Optional[int] = None,
+    chunksize: int = 16,
+    progress: Optional[TextIO] = None,
+    report_every: float = 2.0,
+) -> Dict[str, Any]:
+    """
+    Re-parses every cached page across a process pool and writes one JSON line per page:
+    {"url", "key", "destinations"} or {"url", "key", "error"}.
+    - Lines are written in completion order and flushed as they arrive.
+    - Returns page/record/error counts, parsed bytes (decompressed HTML) and elapsed seconds.
+    - `html_cache` stays open; workers open their own connections to the store.
+    """
+    entries = iter_entries(html_cache)
+    total = len(entries)
+    location = _store_location(html_cache)
+
+    stats = {"pages": 0, "records": 0, "errors": 0, "bytes": 0}
+    start = last_report = time.perf_counter()
+
+    def report(final: bool = False) -> None:
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(
+            f"{'Bitti' if final else 'İlerleme'}: {stats['pages']}/{total} sayfa, "
+            f"{stats['records']} kayıt, {stats['errors']} hata | "
+            f"{stats['pages'] / elapsed:.1f} sayfa/s, {stats['bytes'] / elapsed / 1024 ** 2:.1f} MB/s",
+            file=progress,
+            flush=True,
+        )
+
+    # "spawn": işçiler çağıranın açık bağlantılarını (sqlite/lmdb) devralmaz, kendi depolarını açar;
+    # çağıranın önbelleği açık kalır ve reparse sonrasında da kullanılabilir
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers or os.cpu_count(), initializer=_init_worker, initargs=location) as pool:
+        for record in pool.imap_unordered(_parse_entry, entries, chunksize=chunksize):
+            stats["pages"] += 1
+            stats["bytes"] += record.pop("bytes")
+            if "error" in record:
+                stats["errors"] += 1
+            else:
+                stats["records"] += len(record["destinations"])
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if progress is not None and time.perf_counter() - last_report >= report_every:
+                last_report = time.perf_counter()
+                report()
+
+    stats["seconds"] = time.perf_counter() - start
+    if progress is not None:
+        report(final=True)
+    return stats
+
+
+def _cli() -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description="Önbellekteki tüm sayfalardan destinasyonları yeniden çıkar")
+    p.add_argument("--cache-dir", default=None, help="Önbellek dizini (varsayılan: ./cache)")
+    p.add_argument("--backend", choices=BACKENDS, default=None, help="Depo türü (varsayılan: SCRAPINGBEE_CACHE_BACKEND)")
+    p.add_argument("--out", default="reparsed.jsonl", help="JSONL çıktı dosyası ('-' = stdout)")
+    p.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    p.add_argument("--chunksize", type=int, default=16, help="İşçiye tek seferde verilen sayfa sayısı")
+    args = p.parse_args()
+
+    html_cache = HTMLCache(args.cache_dir, backend=args.backend, memory_bytes=0)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        stats = reparse(html_cache, out, workers=args.workers, chunksize=args.chunksize, progress=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if stats["errors"]:
+        print(f"{stats['errors']} sayfa ayrıştırılamadı; ayrıntılar çıktıdaki 'error' alanında.", file=sys.stderr)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _cli()
@@ -1,9 +1,10 @@
 import streamlit as st
 from ScrapingBee.scrapingbee_cache import get_html
-from bs4 import BeautifulSoup
+from destination_parser import parse_destinations
 import json
 import os
 from gemini_labeler import test_gemini_connection, process_changed_json
+from label_normalizer import LabelIndex
 import time
 import folium
 from geopy.geocoders import Nominatim
@@ -158,42 +159,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def parse_destinations(html: str) -> list[dict]:
-    """
-    Extracts destination titles (h2 or h3) and their paragraph texts from HTML,
-    returns as [{'title': ..., 'content': ...}, ...].
-    """
-    soup = BeautifulSoup(html, "html.parser")
-    data = []
-    for header in soup.find_all(["h2", "h3"]):
-        title = header.get_text(strip=True)
-        paragraphs = []
-        for sib in header.find_next_siblings():
-            if sib.name in ["h2", "h3"]:
-                break
-            if sib.name == "p":
-                text = sib.get_text(strip=True)
-                if text:
-                    paragraphs.append(text)
-        if paragraphs:
-            data.append({
-                "title": title,
-                "content": " ".join(paragraphs)
-            })
-    return data
-
-def display_labeled_data(data):
+def display_labeled_data(data, key="labeled"):
     """Display labeled data in a beautiful format, with optional map/geocoding support"""
     if not data:
         st.warning("No labeled data to display")
         return
 
-    # Statistics
+    # Statistics over canonical labels ("Tarih", "tarihi", "Tarihî yer" count once)
+    label_index = LabelIndex.build(data)
+    label_counts = label_index.counts()
     total_items = len(data)
     items_with_labels = sum(1 for item in data if item.get('labels'))
-    total_labels = sum(len(item.get('labels', [])) for item in data)
+    total_labels = sum(label_counts.values())
 
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.markdown(f"""
         <div class="stat-card">
@@ -215,16 +194,33 @@ def display_labeled_data(data):
             <h2>{total_labels}</h2>
         </div>
         """, unsafe_allow_html=True)
+    with col4:
+        st.markdown(f"""
+        <div class="stat-card">
+            <h3>🔖 Unique Labels</h3>
+            <h2>{len(label_index)}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Etikete göre filtre: seçilen etiketlerin hepsini taşıyan kayıtlar (dizinden, yeniden tarama yok)
+    selected_labels = st.multiselect(
+        "Etikete göre filtrele:",
+        [label for label, _ in label_counts.most_common()],
+        format_func=lambda label: f"{label} ({label_counts[label]})",
+        key=f"{key}_label_filter",
+    )
+    visible = sorted(label_index.records_for_all(selected_labels)) if selected_labels else range(total_items)
 
     # Her bir öğeyi göster
-    for i, item in enumerate(data):
+    for i in visible:
+        item = data[i]
         with st.container():
             st.markdown(f"""
             <div class="destination-card">
                 <h2 style='color:#222;font-size:2rem;font-weight:800;margin-bottom:0.5rem;'>📍 {item.get('title', 'Untitled')}</h2>
             """, unsafe_allow_html=True)
             st.write(item.get('content', 'No content'))
-            labels = item.get('labels', [])
+            labels = label_index.normalizer.normalize_all(item.get('labels') or [])
             if labels:
                 st.markdown("<h4>🏷️ Labels:</h4>", unsafe_allow_html=True)
                 label_html = ""
@@ -443,7 +439,7 @@ if st.button("🚀 Fetch and Parse Data", key="fetch_button"):
         with st.spinner("🔄 Fetching and processing data..."):
             try:
                 html = get_html(url)
-                st.session_state["places"] = parse_destinations(html)
+                st.session_state["places"] = parse_destinations(html, url=url)
                 st.session_state["remove_indices"] = []  # Reset selections on each fetch
                 
                 # Save original data as output.json
@@ -533,7 +529,7 @@ if os.path.exists("changed.json") or st.session_state.get("changed_json_ready",
                     st.session_state["last_labeled_file"] = "labeled_output.json"
                     # Display the labeled data preview
                     st.markdown("### 📊 Labeled Results (Önizleme)")
-                    display_labeled_data(labeled_data)
+                    display_labeled_data(labeled_data, key="preview")
                 except Exception as e:
                     st.markdown(f"""
                     <div class="error-card">
@@ -0,0 +1,126 @@
+"""
+SQLite önbellek altyapısı
+Etiket önbelleği (label_cache) ve coğrafi kodlama önbelleğinin (geocode_cache) ortak
+parçaları; her önbellek yalnızca kendi tablosunu ve anahtarını tanımlar.
+
+• İş parçacığı başına bir bağlantı (WAL kipi): eşzamanlı işçiler aynı dosyayı paylaşır
+• Hit/miss sayaçları ve stats() / clear() / close()
+• is_disabled(): "", "0", "off", "false", "no" ayar değerleri özelliği kapatır
+• Shared: ayar kapalı değilse süreç boyunca tek örneği ilk kullanımda oluşturur
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import threading
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DISABLED_VALUES = ("", "0", "off", "false", "no")
+
+
+def is_disabled(value: str) -> bool:
+    """True for setting values that switch a feature off ("", "0", "off", "false", "no")."""
+    return value.strip().lower() in DISABLED_VALUES
+
+
+class SQLiteCache:
+    """
+    Base of the SQLite-backed caches.
+    - One connection per thread (WAL mode), so concurrent workers can share one file.
+    - `schema` is the CREATE TABLE statement of `table`; subclasses count lookups with _count().
+    """
+
+    def __init__(self, path: str, table: str, schema: str):
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> int:
+        """Deletes every entry and returns how many were deleted."""
+        with self._connect() as conn:
+            return conn.execute(f"DELETE FROM {self.table}").rowcount
+
+    def stats(self) -> Dict[str, float]:
+        entries = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class Shared(Generic[T]):
+    """
+    Process-wide instance made by `factory` on first use, or None while `setting()` is disabled.
+    """
+
+    def __init__(self, setting: Callable[[], str], factory: Callable[[], T]):
+        self._setting = setting
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[T]:
+        if is_disabled(self._setting()):
+            return None
+        with self._lock:
+            if self._instance is None:
+                self._instance = self._factory()
+            return self._instance
+
+
+def run_cli(
+    description: str,
+    default_path: str,
+    open_cache: Callable[[str], SQLiteCache],
+    cleanup: Optional[Tuple[str, str, Callable[[SQLiteCache], int]]] = None,
+) -> None:  # pragma: no cover
+    """
+    Maintenance CLI of a cache: --path, the cache's own `cleanup` flag (flag, help text,
+    function returning the deleted count) and --clear; prints the entry count.
+    """
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument("--path", default=default_path, help="Önbellek dosyası")
+    if cleanup:
+        p.add_argument(f"--{cleanup[0]}", action="store_true", help=cleanup[1])
+    p.add_argument("--clear", action="store_true", help="Tüm kayıtları sil")
+    args = p.parse_args()
+
+    cache = open_cache(args.path)
+    if cleanup and getattr(args, cleanup[0]):
+        print(f"Silinen eski kayıt: {cleanup[2](cache)}")
+    if args.clear:
+        print(f"Silinen kayıt: {cache.clear()}")
+    print(f"Kayıt sayısı: {cache.stats()['entries']}")
@@ -0,0 +1,119 @@
+import json
+from types import SimpleNamespace
+
+from geopy.exc import GeocoderUnavailable
+
+from checkpoint import CheckpointLog, record_id
+from geocoding_system import GeocodingSystem
+from rate_limit import TokenBucket
+
+
+def test_log_survives_restart_and_torn_line(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = CheckpointLog(path)
+    log.append("a", "stage1", {"title": "a", "coordinates": None})
+    log.append("b", "stage1", {"title": "b"})
+    log.append("a", "stage2", {"title": "a", "coordinates": {"latitude": 1}})
+    log.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "c", "sta')  # crash in the middle of a write
+
+    reopened = CheckpointLog(path)
+    assert set(reopened.completed("stage1")) == {"a", "b"}
+    assert reopened.latest()["a"]["coordinates"] == {"latitude": 1}
+    assert not reopened.is_done("c", "stage1")
+    reopened.compact()
+    assert len(CheckpointLog(path)) == 3
+    assert record_id({"title": "x", "content": "y"}) == record_id({"content": "y", "title": "x"})
+
+
+def test_append_after_torn_line_starts_a_new_line(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = CheckpointLog(path)
+    log.append("a", "label", 1)
+    log.append("b", "label", 2)
+    log.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "c", "stage": "lab')  # crash in the middle of a write
+
+    CheckpointLog(path).append("d", "label", 4)
+    assert set(CheckpointLog(path).completed("label")) == {"a", "b", "d"}
+
+
+def test_geocoding_stage_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    geo = GeocodingSystem()
+    calls = []
+    crashed = []
+
+    def fake_stage(locations, city="", country="", on_done=None):
+        resolved = []
+        for loc in locations:
+            calls.append(loc["title"])
+            loc["coordinates"] = {"latitude": 1.0, "longitude": 2.0, "method": "fake"}
+            resolved.append(loc)
+            on_done(loc)
+            if loc["title"] == "B" and not crashed:
+                crashed.append(True)
+                raise KeyboardInterrupt  # simulated crash mid-stage
+        return resolved, []
+
+    monkeypatch.setattr(geo, "stage1_nominatim_basic", fake_stage)
+    locations = [{"title": t, "content": ""} for t in ("A", "B", "C")]
+    try:
+        geo.process_stage(1, [dict(loc) for loc in locations])
+    except KeyboardInterrupt:
+        pass
+
+    restarted = GeocodingSystem()
+    assert {loc["title"] for loc in restarted.resolved_locations} == {"A", "B"}
+    monkeypatch.setattr(restarted, "stage1_nominatim_basic", fake_stage)
+    result = restarted.process_stage(1, [dict(loc) for loc in locations])
+    assert calls == ["A", "B", "C"]
+    assert result["resolved_count"] == 3
+    with open(tmp_path / "bulunanlar.json", encoding="utf-8") as f:
+        assert {loc["title"] for loc in json.load(f)} == {"A", "B", "C"}
+
+    # Same titles for another city are new records, not resumed ones
+    other = restarted.process_stage(1, [dict(loc) for loc in locations], city="İzmir")
+    assert calls == ["A", "B", "C", "A", "B", "C"] and other["resolved_count"] == 3
+
+
+class FlakyNominatim:
+    """Unavailable on the first request, then finds every query."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def geocode(self, query, timeout=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise GeocoderUnavailable("down")
+        return SimpleNamespace(latitude=41.0, longitude=29.0)
+
+
+def test_failed_location_is_retried_on_next_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    nominatim = FlakyNominatim()
+    options = {"cache": False, "limiters": {"nominatim": TokenBucket(10 ** 6)}}
+    geo = GeocodingSystem(**options)
+    geo.nominatim = nominatim
+    first = geo.process_stage(1, [{"title": "Balat", "content": ""}], city="İstanbul")
+    assert first["remaining_count"] == 1 and nominatim.calls == 1
+
+    restarted = GeocodingSystem(**options)
+    restarted.nominatim = nominatim
+    second = restarted.process_stage(1, [{"title": "Balat", "content": ""}], city="İstanbul")
+    assert second["resolved_count"] == 1 and nominatim.calls == 2
+
+
+def test_restore_keeps_same_title_in_different_cities_apart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    geo = GeocodingSystem(cache=False, limiters={"nominatim": TokenBucket(10 ** 6)})
+    geo.nominatim = SimpleNamespace(geocode=lambda query, timeout=None: SimpleNamespace(latitude=1.0, longitude=2.0))
+    geo.process_stage(1, [{"title": "Kale", "content": "a"}], city="İzmir")
+    geo.process_stage(1, [{"title": "Kale", "content": "b"}], city="Ankara")
+
+    restarted = GeocodingSystem(cache=False)
+    queries = sorted(loc["coordinates"]["query"] for loc in restarted.resolved_locations)
+    assert queries == ["Kale, Ankara, Türkiye", "Kale, İzmir, Türkiye"]
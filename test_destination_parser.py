@@ -0,0 +1,63 @@
+import json
+
+from bench_destination_parser import build_page
+from destination_parser import iter_destinations, load_rules, parse_destinations, parse_destinations_soup, select_rule
+
+PAGES = [
+    "<h2>A</h2><p>one</p><p> two <b>x</b></p><h3>B</h3><div><p>no</p></div><p>three</p>",
+    "<div><h2>X</h2><p>a</p></div><h2>Y</h2><p>b<!-- c --></p><p></p><p>c<script>var z</script></p>",
+    "<h2>Only</h2><div><h3>In</h3><p>deep</p></div><p>after</p>",
+    "<p>pre</p><h2>T <span>s</span></h2>\n<p>p1</p>\n<ul><li>x</li></ul><p>p2</p><h2>Empty</h2>",
+]
+
+
+def test_matches_reference_implementation():
+    for html in PAGES + [build_page(50)]:
+        assert parse_destinations(html) == parse_destinations_soup(html)
+
+
+def test_blank_html_gives_no_records():
+    for html in ["", "   \n", "<!-- x -->"]:
+        assert parse_destinations(html) == parse_destinations_soup(html) == []
+    assert list(iter_destinations(iter(["", ""]))) == []
+
+
+def test_streams_records_from_chunks():
+    html = build_page(20)
+    chunks = [html[i:i + 100] for i in range(0, len(html), 100)]
+    stream = iter_destinations(iter(chunks))
+    first = next(stream)
+    assert first["title"] == "1. Destinasyon#0"
+    assert len([first] + list(stream)) == 20
+
+
+def test_extraction_rule_selected_by_domain(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"rules": [
+        {"name": "cards", "domains": ["*.example.com"], "type": "css",
+         "record": "div.card", "title": ".name", "content": ".desc p"},
+        {"name": "list", "domains": ["example.org"], "url_pattern": "/guide/", "type": "xpath",
+         "record": "//li", "title": "./strong", "content": "./span"},
+    ]}), encoding="utf-8")
+    rules = load_rules(str(rules_file))
+    cards = '<div class="card"><div class="name">Kapadokya</div><div class="desc"><p>Balonlar</p><p>vadiler</p></div></div>' \
+            '<div class="card"><div class="name">Boş</div></div>'
+    listing = "<ul><li><strong>Efes</strong><span>Antik kent</span></li></ul><h2>H</h2><p>p</p>"
+
+    assert parse_destinations(cards, url="https://www.example.com/x", rules=rules) == [
+        {"title": "Kapadokya", "content": "Balonlar vadiler"}
+    ]
+    assert parse_destinations(listing, url="https://example.org/guide/1", rules=rules) == [
+        {"title": "Efes", "content": "Antik kent"}
+    ]
+    # No matching rule: heading-based extraction
+    assert parse_destinations(listing, url="https://example.org/other", rules=rules) == [{"title": "H", "content": "p"}]
+    assert select_rule("https://notexample.com/", rules) is None
+
+    # Blank pages and XHTML with an encoding declaration must not crash a matching rule
+    assert parse_destinations("", url="https://www.example.com/x", rules=rules) == []
+    assert parse_destinations("<!-- x -->", url="https://www.example.com/x", rules=rules) == []
+    xhtml = '<?xml version="1.0" encoding="UTF-8"?>\n<html xmlns="http://www.w3.org/1999/xhtml"><body>' + cards + "</body></html>"
+    assert parse_destinations(xhtml, url="https://www.example.com/x", rules=rules) == [
+        {"title": "Kapadokya", "content": "Balonlar vadiler"}
+    ]
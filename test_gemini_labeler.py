@@ -0,0 +1,220 @@
+import json
+import threading
+
+import pytest
+
+import gemini_labeler
+from gemini_labeler import PROMPT_TEMPLATE, generate_labels_for_text, label_texts, make_batches, parse_labels
+from label_cache import LabelCache
+from rate_limit import TokenBucket
+from test_rate_limit import FakeClock
+
+
+@pytest.fixture(autouse=True)
+def unlimited_quota(monkeypatch):
+    """The process-wide quota buckets would make later tests wait on earlier ones."""
+    monkeypatch.setattr(gemini_labeler, "_default_limiters", (TokenBucket(10 ** 6), TokenBucket(10 ** 9)))
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Answers with the first word of the text; fails with a quota error on request."""
+
+    def __init__(self, quota_failures=0):
+        self.quota_failures = quota_failures
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self.lock:
+            self.calls += 1
+            if self.quota_failures:
+                self.quota_failures -= 1
+                raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+        word = prompt.rsplit("\n", 1)[-1].split()[0]
+        return FakeResponse(f'["{word}", "gezi"]')
+
+
+def test_label_texts_keeps_order_and_retries_quota_errors(monkeypatch):
+    monkeypatch.setattr(gemini_labeler.random, "uniform", lambda a, b: b)
+    clock = FakeClock()
+    model = FakeModel(quota_failures=2)
+    texts = [f"metin{i} açıklama" for i in range(20)]
+    seen = []
+
+    labels = label_texts(
+        texts,
+        model=model,
+        concurrency=4,
+        requests_limiter=TokenBucket(rate=1000, capacity=1000, clock=clock, sleep=clock.sleep),
+        tokens_limiter=TokenBucket(rate=10 ** 6, capacity=10 ** 6, clock=clock, sleep=clock.sleep),
+        on_result=lambda index, result: seen.append(index),
+        cache=False,
+        batch_size=1,
+        local=False,
+    )
+
+    assert labels == [[f"metin{i}", "gezi"] for i in range(20)]
+    assert sorted(seen) == list(range(20))
+    assert model.calls == 22
+    assert clock.now >= 2.0  # backed off after the quota errors
+
+
+def test_rpm_limit_spaces_requests():
+    clock = FakeClock()
+    label_texts(
+        ["a", "b", "c", "d"],
+        model=FakeModel(),
+        concurrency=1,
+        requests_limiter=TokenBucket.per_minute(60, burst=1, clock=clock, sleep=clock.sleep),
+        tokens_limiter=TokenBucket(rate=10 ** 6, clock=clock, sleep=clock.sleep),
+        cache=False,
+        batch_size=1,
+        local=False,
+    )
+    assert clock.now == 3.0
+
+
+def test_parse_labels_fallback():
+    assert parse_labels('Etiketler: ["tarih", "müze"]') == ["tarih", "müze"]
+    assert parse_labels("yok") == []
+
+
+def test_label_cache_skips_unchanged_texts(tmp_path):
+    cache = LabelCache(str(tmp_path / "labels.sqlite3"))
+    model = FakeModel()
+    texts = ["Galata kulesi", "Balat  evleri", "Efes antik kent"]
+    first = label_texts(texts, model=model, cache=cache, batch_size=1, local=False)
+    # Whitespace-only changes still hit; only the new text is sent
+    second = label_texts(["Galata   kulesi", "Balat evleri", "Efes antik kent", "Kapadokya balon"], model=model, cache=cache, batch_size=1, local=False)
+    assert second[:3] == first and model.calls == 4
+    assert generate_labels_for_text("Efes antik kent", model=model, cache=cache) == first[2] and model.calls == 4
+    assert cache.stats()["hits"] == 3 + 1
+
+    # A changed prompt template must not reuse old labels
+    assert cache.get("gemini-2.5-pro", PROMPT_TEMPLATE + " ", "Efes antik kent") is None
+    assert cache.purge(PROMPT_TEMPLATE) == 0 and cache.purge() == 4
+
+
+class FakeBatchModel(FakeModel):
+    """Answers batch prompts with a JSON object, dropping item 2 and garbling item 3."""
+
+    def generate_content(self, prompt):
+        if "[1]" not in prompt:
+            return super().generate_content(prompt)
+        with self.lock:
+            self.calls += 1
+        answer = {}
+        for line in prompt.split("\n"):
+            if line.startswith("["):
+                item_id, text = line[1:].split("] ", 1)
+                answer[item_id] = [text.split()[0]] if item_id not in ("2", "3") else None
+        answer["3"] = "bozuk"
+        del answer["2"]
+        return FakeResponse("```json\n" + json.dumps(answer) + "\n```")
+
+
+def test_batched_labeling_falls_back_per_item():
+    model = FakeBatchModel()
+    texts = [f"yer{i} açıklama" for i in range(8)]
+    labels = label_texts(texts, model=model, cache=False, batch_size=4, batch_tokens=10 ** 6, local=False)
+    assert labels[0] == ["yer0"] and labels[3] == ["yer3"]
+    assert labels[1] == ["yer1", "gezi"] and labels[2] == ["yer2", "gezi"]  # per-item fallback
+    assert model.calls == 2 + 4
+
+
+def test_make_batches_respects_token_budget():
+    texts = ["x" * 400, "y" * 400, "z" * 4, "w" * 4]
+    assert make_batches(texts, range(4), batch_size=10, token_budget=150) == [[0], [1, 2, 3]]
+    assert make_batches(texts, range(4), batch_size=2, token_budget=10 ** 6) == [[0, 1], [2, 3]]
+
+
+def test_health_check_is_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini_labeler, "GEMINI_HEALTH_FILE", str(tmp_path / "health.json"))
+    monkeypatch.setattr(gemini_labeler, "_health_checks", {})
+    probes = []
+
+    def probe(api_key, model_name):
+        probes.append(model_name)
+        if model_name == "broken":
+            raise RuntimeError("404 model not found")
+
+    assert gemini_labeler.check_gemini_health(probe=probe)
+    assert gemini_labeler.check_gemini_health(probe=probe)
+    # A new process only has the health file
+    monkeypatch.setattr(gemini_labeler, "_health_checks", {})
+    assert gemini_labeler.check_gemini_health(probe=probe)
+    assert probes == [gemini_labeler.MODEL_NAME]
+
+    assert gemini_labeler.check_gemini_health(force=True, probe=probe) and len(probes) == 2
+    assert gemini_labeler.check_gemini_health(ttl=-1, probe=probe) and len(probes) == 3
+    # Failures are not cached
+    assert not gemini_labeler.check_gemini_health(model_name="broken", probe=probe)
+    assert not gemini_labeler.check_gemini_health(model_name="broken", probe=probe) and len(probes) == 5
+    assert "test-key" not in (tmp_path / "health.json").read_text()
+
+
+def test_label_file_streams_and_resumes(tmp_path):
+    source = tmp_path / "changed.json"
+    source.write_text(json.dumps([{"title": f"T{i}", "content": f"yer{i} metni" if i != 3 else ""} for i in range(7)]), encoding="utf-8")
+    out = tmp_path / "labeled.jsonl"
+
+    class FailingModel(FakeModel):
+        def generate_content(self, prompt):
+            if "yer5" in prompt:
+                raise ValueError("bad request")
+            return super().generate_content(prompt)
+
+    counts = gemini_labeler.label_file(str(source), str(out), model=FailingModel(), cache=False, batch_size=1, window=2, local=False)
+    assert counts == {"labeled": 6, "failed": 1, "skipped": 0}
+
+    model = FakeModel()
+    counts = gemini_labeler.label_file(str(source), str(out), model=model, cache=False, batch_size=1, local=False)
+    assert counts == {"labeled": 1, "failed": 0, "skipped": 6} and model.calls == 1
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 7 and not any(r.get("label_error") for r in records)
+    labeled = {r["title"]: r["labels"] for r in records}
+    assert labeled["T5"] == ["yer5", "gezi"] and labeled["T3"] == []
+
+
+def test_label_file_resumes_after_torn_line(tmp_path):
+    source = tmp_path / "changed.jsonl"
+    source.write_text("".join(json.dumps({"title": f"T{i}", "content": f"yer{i} metni"}) + "\n" for i in range(3)), encoding="utf-8")
+    out = tmp_path / "labeled.jsonl"
+    out.write_text(json.dumps({"title": "T0", "content": "yer0 metni", "labels": ["yer0"]}) + "\n" + '{"title": "T1", "cont', encoding="utf-8")
+
+    counts = gemini_labeler.label_file(str(source), str(out), model=FakeModel(), cache=False, batch_size=1, local=False)
+    assert counts == {"labeled": 2, "failed": 0, "skipped": 1}
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["title"] for r in records) == ["T0", "T1", "T2"]
+
+
+def test_label_text_raises_and_keeps_stdout_clean(capsys):
+    assert gemini_labeler.label_text("galata kulesi", model=FakeModel(), cache=False, local=False) == ["galata", "gezi"]
+
+    class BrokenModel:
+        def generate_content(self, prompt):
+            raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        gemini_labeler.label_text("galata kulesi", model=BrokenModel(), cache=False, local=False)
+    captured = capsys.readouterr()
+    assert captured.out == "" and "bad request" in captured.err
+
+
+def test_default_limiters_are_shared(monkeypatch):
+    monkeypatch.setattr(gemini_labeler, "_default_limiters", None)
+    first = gemini_labeler.get_default_limiters()
+    assert gemini_labeler.get_default_limiters() is first
+    # label_texts without explicit limiters draws from the shared buckets
+    clock = FakeClock()
+    shared = (TokenBucket(1, capacity=1, clock=clock, sleep=clock.sleep), TokenBucket(10 ** 6, clock=clock, sleep=clock.sleep))
+    monkeypatch.setattr(gemini_labeler, "_default_limiters", shared)
+    for _ in range(3):
+        label_texts(["a"], model=FakeModel(), concurrency=1, cache=False, batch_size=1, local=False)
+    assert clock.now == 2.0
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from geocode_cache import MISS, GeocodeCache, normalize_query
+from geocoding_cli import GeocodingSystem
+from rate_limit import TokenBucket
+from test_rate_limit import FakeClock
+
+
+def test_hits_and_negatives_expire_separately(tmp_path):
+    clock = FakeClock()
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"), ttl=100, negative_ttl=10, clock=clock)
+    cache.put("nominatim", "Galata Kulesi, İstanbul", (41.02, 28.97))
+    cache.put("nominatim", "Yok Böyle Yer", None)
+
+    assert cache.get("nominatim", "  galata  kulesi ,İSTANBUL ") == (41.02, 28.97)
+    assert cache.get("photon", "Galata Kulesi, İstanbul") is MISS
+    assert cache.get("nominatim", "yok böyle yer") is None
+    clock.now = 50
+    assert cache.get("nominatim", "yok böyle yer") is MISS
+    assert cache.get("nominatim", "Galata Kulesi, İstanbul") == (41.02, 28.97)
+    assert cache.prune() == 1 and cache.stats()["entries"] == 1
+    assert normalize_query("Işık  Sokağı,İzmir") == "ışık sokağı, izmir"
+
+
+def test_errors_are_not_cached(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"))
+
+    def failing():
+        raise TimeoutError("timed out")
+
+    with pytest.raises(TimeoutError):
+        cache.lookup("photon", "Balat", failing)
+    assert cache.lookup("photon", "Balat", lambda: (41.03, 28.95)) == (41.03, 28.95)
+    assert cache.lookup("photon", "Balat", failing) == (41.03, 28.95)
+
+
+def test_rerun_is_served_from_cache(tmp_path):
+    calls = []
+
+    def geocode(query, timeout=None):
+        calls.append(query)
+        return SimpleNamespace(latitude=41.0, longitude=29.0) if query.startswith("Galata") else None
+
+    def run():
+        clock = FakeClock()
+        limiters = {provider: TokenBucket(1, clock=clock, sleep=clock.sleep) for provider in ("nominatim", "photon")}
+        geo = GeocodingSystem(limiters=limiters, cache=GeocodeCache(str(tmp_path / "geo.sqlite3")))
+        geo.nominatim = SimpleNamespace(geocode=geocode)
+        geo._photon = lambda *args: None
+        geo.opencage_key = None
+        locations = [{"title": "Galata", "content": ""}, {"title": "Bilinmeyen", "content": ""}]
+        geo.resolve(locations, city="İstanbul")
+        return geo
+
+    first = run()
+    sent = len(calls)
+    second = run()
+    assert len(calls) == sent  # nothing sent again, found or not
+    assert [loc["title"] for loc in second.resolved] == [loc["title"] for loc in first.resolved] == ["Galata"]
+    assert second.cache.stats()["misses"] == 0
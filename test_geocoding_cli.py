@@ -0,0 +1,117 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from geopy.exc import GeocoderRateLimited
+
+from geocode_cache import location_point
+from geocoding_cli import GeocodingSystem
+from geocoding_system import GeocodingSystem as StreamlitGeocodingSystem
+from rate_limit import RATE_LIMIT_BACKOFF, TokenBucket, limited_request
+from test_rate_limit import FakeClock
+
+
+def make_system(clock):
+    limiters = {provider: TokenBucket(rate, capacity=1, clock=clock, sleep=clock.sleep)
+                for provider, rate in (("nominatim", 1.0), ("photon", 2.0), ("opencage", 1.0))}
+    geo = GeocodingSystem(limiters=limiters, cache=False)
+    geo.opencage_key = None
+    return geo
+
+
+def test_resolve_tries_providers_in_order_and_keeps_input_order():
+    clock = FakeClock()
+    geo = make_system(clock)
+    geo._nominatim = lambda title, *args: (1.0, 2.0) if title.startswith("n") else None
+    geo._nominatim_variants = lambda title, *args: (3.0, 4.0) if title.startswith("v") else None
+    geo._photon = lambda title, *args: (5.0, 6.0) if title.startswith("p") else None
+    done = {"title": "d", "content": "", "coordinates": {"latitude": 0, "longitude": 0, "method": "old"}}
+    locations = [{"title": t, "content": ""} for t in ("p1", "n1", "x1", "v1", "p2")] + [done]
+
+    geo.resolve(locations, city="İstanbul")
+
+    assert [loc["title"] for loc in geo.resolved] == ["p1", "n1", "v1", "p2", "d"]
+    assert [loc["title"] for loc in geo.remaining] == ["x1"]
+    assert [loc["coordinates"]["method"] for loc in geo.resolved] == [
+        "photon", "nominatim_basic", "nominatim_variants", "photon", "old"]
+    # Nominatim is hit twice per unresolved item at 1 req/s; nothing sleeps per location
+    assert clock.now <= 2 * 5
+
+
+def test_photon_runs_while_nominatim_is_busy():
+    geo = make_system(FakeClock())
+    photon_started = threading.Event()
+    waited = []
+
+    def nominatim(title, *args):
+        if title == "last":
+            # Sequential stages would deadlock here: Photon must already be working on "first"
+            waited.append(photon_started.wait(timeout=5))
+        return None
+
+    def photon(title, *args):
+        photon_started.set()
+        return (1.0, 1.0)
+
+    geo._nominatim = nominatim
+    geo._nominatim_variants = lambda *args: None
+    geo._photon = photon
+    geo.resolve([{"title": "first", "content": ""}, {"title": "last", "content": ""}])
+    assert waited == [True]
+    assert len(geo.resolved) == 2 and not geo.remaining
+
+
+class ScriptedGeocoder:
+    """geopy-like geocoder answering from a script: points, None, or exceptions to raise."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.queries = []
+
+    def geocode(self, query, timeout=None):
+        self.queries.append(query)
+        answer = self.answers.pop(0) if self.answers else None
+        if isinstance(answer, Exception):
+            raise answer
+        return answer and SimpleNamespace(latitude=answer[0], longitude=answer[1])
+
+
+def test_rate_limited_request_honors_retry_after():
+    clock = FakeClock()
+    limiter = TokenBucket(1, clock=clock, sleep=clock.sleep)
+    coder = ScriptedGeocoder(GeocoderRateLimited("429", retry_after=30), (41.0, 29.0))
+    assert limited_request(limiter, lambda: location_point(coder.geocode("Galata"))) == (41.0, 29.0)
+    assert clock.now >= 30 and len(coder.queries) == 2
+
+    # Without Retry-After: exponential backoff; absurd waits are not made
+    coder = ScriptedGeocoder(GeocoderRateLimited("429"), (1.0, 2.0))
+    start = clock.now
+    assert limited_request(limiter, lambda: location_point(coder.geocode("x"))) == (1.0, 2.0)
+    assert clock.now - start >= RATE_LIMIT_BACKOFF
+    coder = ScriptedGeocoder(GeocoderRateLimited("429", retry_after=3600))
+    start = clock.now
+    with pytest.raises(GeocoderRateLimited):
+        limited_request(limiter, lambda: coder.geocode("y"))
+    assert clock.now - start < 2
+
+
+def test_streamlit_system_waits_only_between_real_requests(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    clock = FakeClock()
+    limiter = TokenBucket(1, clock=clock, sleep=clock.sleep)
+    geo = StreamlitGeocodingSystem(cache=False, limiters={"nominatim": limiter})
+    geo.nominatim = ScriptedGeocoder((1.0, 1.0), None, (2.0, 2.0))
+    locations = [{"title": t, "content": ""} for t in ("a", "b", "c")]
+    locations.append({"title": "d", "content": "", "coordinates": {"latitude": 0, "longitude": 0}})
+
+    resolved, remaining = geo.stage1_nominatim_basic(locations, city="İstanbul")
+
+    assert [loc["title"] for loc in resolved] == ["a", "c", "d"] and [loc["title"] for loc in remaining] == ["b"]
+    # Three requests at 1/s: the first is free, nothing is spent on the already-located "d"
+    assert clock.sleeps == [1.0, 1.0] and clock.now == 2.0
+
+
+def test_positional_sleep_is_still_accepted():
+    with pytest.warns(DeprecationWarning):
+        geo = GeocodingSystem(1.0, cache=False)
+    assert set(geo.limiters) == {"nominatim", "photon", "opencage"}
@@ -0,0 +1,45 @@
+from gemini_labeler import parse_batch_labels, parse_labels
+from label_normalizer import LabelIndex, LabelNormalizer, fold_key, normalize_labels
+
+
+def test_spelling_variants_share_one_label():
+    assert normalize_labels(["Tarih", "tarihi", "Tarihî yer", "TARİHİ MEKAN"]) == ["tarih"]
+    assert normalize_labels(["Müzeler", "MÜZE", "muzesi", "Sahil", "doğal güzellik"]) == ["müze", "plaj", "doğa"]
+    assert fold_key("  Çarşı,  Pazarı! ") == "carsi pazari"
+
+
+def test_unknown_labels_are_normalized_independently_of_order():
+    first, second = LabelNormalizer(synonyms={}), LabelNormalizer(synonyms={})
+    assert first.normalize("KAPALI  CARSI") == "kapalı carsı"
+    assert first.normalize("Kapalı Çarşı!") == second.normalize("Kapalı Çarşı!") == "kapalı çarşı"
+    assert first.normalize_all(["Işık", "ışık", ""]) == ["ışık"]
+
+
+def test_place_names_are_not_stemmed_into_categories():
+    assert normalize_labels(["Denizli", "Camili", "Kaleiçi", "Kemer"]) == ["denizli", "camili", "kaleiçi", "kemer"]
+    assert normalize_labels(["Kent", "Antik Kent"]) == ["kent", "tarih"]
+    assert normalize_labels(["Kaleler", "Denizleri", "Saraylar"]) == ["kale", "deniz", "saray"]
+
+
+def test_label_index_lookups():
+    records = [
+        {"title": "Topkapı", "labels": ["Tarihi", "Müze", "saray"]},
+        {"title": "Kilyos", "labels": ["Sahil"]},
+        {"title": "Ayasofya", "labels": ["tarih", "müzesi"]},
+        {"title": "Boş"},
+    ]
+    index = LabelIndex.build(records)
+    assert index.records_for("Tarihî yer") == {0, 2}
+    assert index.records_for_all(["tarih", "saray"]) == {0}
+    assert index.records_for_all(["plaj", "tarih"]) == set()
+    assert index.counts()["müze"] == 2 and len(index) == 4
+    assert "kumsal" in index and "orman" not in index
+
+
+def test_strict_parsing():
+    assert parse_labels('```json\n["Tarihi", "müze", "tarih"]\n```') == ["tarih", "müze"]
+    assert parse_labels("['Sahil']") == ["plaj"]
+    assert parse_labels('{"labels": "tarih"}') == []
+    assert parse_labels("[1, 2]") == []
+    assert parse_labels("[tarih, müze") == []
+    assert parse_batch_labels('{"1": ["Sahil", "Kumsal"], "2": [3]}', ["1", "2"]) == {"1": ["plaj"]}
@@ -0,0 +1,48 @@
+import json
+
+import gemini_labeler
+from evaluate_local_labeler import evaluate
+from local_labeler import LocalLabeler, tokenize, train_from_files
+from test_gemini_labeler import FakeModel
+
+BEACH = "Turkuaz denizi ve ince kumlu plajı ile yüzmek için ideal bir koy, plaj şemsiyeleri ve deniz manzarası"
+MUSEUM = "Osmanlı dönemine ait tarihi eserlerin sergilendiği müze, tarihi saray koleksiyonu ve arkeoloji bölümü"
+FOREST = "Çam ormanları arasında yürüyüş parkurları, şelale ve doğa manzarası sunan milli park"
+TRAINING = [
+    {"content": f"{text} {i}. bölge", "labels": labels}
+    for i in range(10)
+    for text, labels in ((BEACH, ["plaj", "deniz"]), (MUSEUM, ["tarih", "müze"]), (FOREST, ["doğa"]))
+]
+
+
+def test_tokenize_is_turkish_aware():
+    assert tokenize("İSTANBUL sokakları ve Işıklı müzeleri") == ["istan", "sokak", "ışıkl", "müzel"]
+
+
+def test_confident_items_skip_gemini(tmp_path):
+    path = tmp_path / "labeled_output.json"
+    path.write_text(json.dumps(TRAINING, ensure_ascii=False), encoding="utf-8")
+    local = train_from_files([str(path)])
+    assert isinstance(local, LocalLabeler)
+
+    texts = ["Kumlu plajı ve turkuaz denizi ile yüzmek için koy", "Kapadokya peri bacaları balon turu"]
+    (labels, confidence), (unsure, _) = local.predict(texts)
+    assert set(labels) == {"plaj", "deniz"} and confidence >= local.threshold
+    assert unsure == []
+
+    model = FakeModel()
+    result = gemini_labeler.label_texts(texts, model=model, cache=False, batch_size=1, local=local)
+    assert result[0] == labels and result[1] == ["kapadokya", "gezi"] and model.calls == 1
+
+
+def test_evaluation_reports_coverage_and_precision():
+    report = evaluate(TRAINING, thresholds=[0.3, 1.01], folds=3)
+    assert report[0.3]["coverage"] == 1.0 and report[0.3]["precision"] > 0.9
+    assert report[1.01]["coverage"] == 0.0
+
+
+def test_evaluation_uses_production_label_normalization():
+    # Spelling variants of one label count as the same label, as in train_from_files
+    variants = [{**record, "labels": ["Sahil", "Denizi"] if record["labels"][0] == "plaj" else record["labels"]}
+                for record in TRAINING[::2]] + TRAINING[1::2]
+    assert evaluate(variants, thresholds=[0.3], folds=3)[0.3]["precision"] > 0.9
@@ -0,0 +1,57 @@
+import io
+import json
+
+from pipeline import run_pipeline
+
+PAGES = {
+    "https://a.example/": "<h2>Galata</h2><p>Kule</p><h2>Balat</h2><p>Renkli evler</p>",
+    "https://b.example/": "<h2>Efes</h2><p>Antik kent</p>",
+}
+
+
+def fake_fetch(urls):
+    for url in urls:
+        if url in PAGES:
+            yield url, PAGES[url], None
+        else:
+            yield url, None, RuntimeError("404")
+
+
+def test_streams_records_through_all_stages():
+    def geocode(record):
+        if record["title"] == "Balat":
+            raise ValueError("kota")
+        return {"latitude": 41.0, "longitude": 28.9, "method": "fake"}
+
+    out = io.StringIO()
+    counts = run_pipeline(
+        ["https://a.example/", "https://b.example/", "https://missing.example/", "https://a.example/"],
+        out,
+        fetch=fake_fetch,
+        label=lambda text: [text.split()[0].lower()],
+        geocode=geocode,
+        label_workers=3,
+        geocode_workers=2,
+        queue_size=1,
+    )
+
+    lines = {(line["url"], line.get("title")): line for line in map(json.loads, out.getvalue().splitlines())}
+    assert counts == {"records": 2, "errors": 2}
+    assert lines[("https://b.example/", "Efes")]["labels"] == ["antik"]
+    assert lines[("https://a.example/", "Galata")]["coordinates"]["method"] == "fake"
+    assert lines[("https://a.example/", "Balat")]["stage"] == "geocode"
+    assert lines[("https://missing.example/", None)]["stage"] == "fetch"
+
+
+def test_label_failures_are_recorded_with_stage():
+    def label(text):
+        if text.startswith("Renkli"):
+            raise ValueError("bad request")
+        return ["gezi"]
+
+    out = io.StringIO()
+    counts = run_pipeline(["https://a.example/"], out, fetch=fake_fetch, label=label, geocode=False)
+    lines = {line["title"]: line for line in map(json.loads, out.getvalue().splitlines())}
+    assert counts == {"records": 1, "errors": 1}
+    assert lines["Galata"]["labels"] == ["gezi"]
+    assert lines["Balat"]["stage"] == "label" and "bad request" in lines["Balat"]["error"]
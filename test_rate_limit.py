@@ -0,0 +1,38 @@
+import threading
+
+from rate_limit import TokenBucket
+
+
+class FakeClock:
+    """Manual clock whose sleep() advances time instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+def test_bucket_waits_only_as_needed():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == 0.5  # third token refills at 2/s
+    clock.now += 10  # idle time refills up to the capacity only
+    assert bucket.acquire(2) == 0
+    assert bucket.acquire(3) == 1.5  # larger than capacity: waits longer
+    assert not bucket.try_acquire()
+
+
+def test_pause_holds_back_callers():
+    clock = FakeClock()
+    bucket = TokenBucket.per_minute(60, clock=clock, sleep=clock.sleep)
+    bucket.pause(5)
+    assert bucket.acquire() == 6  # 5 s pause, then one token at 1/s
@@ -0,0 +1,37 @@
+import io
+import json
+
+import pytest
+
+from record_stream import iter_json_array, iter_records, repair_jsonl_tail
+
+
+def test_json_array_is_parsed_incrementally():
+    data = [{"title": f"T{i}", "content": "] , [" * (i % 3), "n": i * 1.5} for i in range(50)] + [12345, None, []]
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    for chunk_size in (1, 7, 4096):
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO("[1, 2"), 1))
+
+
+def test_iter_records_reads_jsonl(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_text('{"a": 1}\n\n{"a": 2}\n', encoding="utf-8")
+    assert list(iter_records(str(path))) == [{"a": 1}, {"a": 2}]
+
+
+def test_torn_jsonl_tail_is_skipped_and_repaired(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_text('{"a": 1}\n{"a": "yar', encoding="utf-8")
+    assert list(iter_records(str(path))) == [{"a": 1}]
+    repair_jsonl_tail(str(path), chunk_size=3)
+    assert path.read_text(encoding="utf-8") == '{"a": 1}\n'
+
+    path.write_text('{"a": 1}\n{"a": 2}', encoding="utf-8")
+    repair_jsonl_tail(str(path))
+    assert path.read_text(encoding="utf-8") == '{"a": 1}\n{"a": 2}\n'
+
+    path.write_text('{"a": 1}\n{"a": "yar\n{"a": 2}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
@@ -0,0 +1,30 @@
+import io
+import json
+
+from ScrapingBee.scrapingbee_cache import HTMLCache
+from ScrapingBee.scrapingbee_cache.utils import url_to_key
+from reparse_cache import reparse
+
+
+def test_reparses_every_entry_and_captures_errors(tmp_path):
+    for backend in ("filesystem", "sqlite", "lmdb"):
+        (tmp_path / backend).mkdir()
+        html_cache = HTMLCache(str(tmp_path / backend), backend=backend, codec="gzip", memory_bytes=0)
+        for i in range(5):
+            html_cache.store(f"https://example.net/{i}", f"<h2>Yer {i}</h2><p>Açıklama {i}</p>")
+        broken = "https://example.net/broken"
+        html_cache.store(broken, "<h2>x</h2>")
+        html_cache.backend.write(url_to_key(broken), b"\x1f\x8b\x08 truncated gzip", html_cache.backend.read_meta(url_to_key(broken)))
+
+        out = io.StringIO()
+        stats = reparse(html_cache, out, workers=2, chunksize=2)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert stats["pages"] == len(lines) == 6
+        assert stats["records"] == 5 and stats["errors"] == 1
+        by_url = {line["url"]: line for line in lines}
+        assert by_url["https://example.net/3"]["destinations"] == [{"title": "Yer 3", "content": "Açıklama 3"}]
+        assert "error" in by_url[broken]
+        assert stats["bytes"] >= sum(len(f"<h2>Yer {i}</h2><p>Açıklama {i}</p>".encode()) for i in range(5))
+        # The caller's cache is still usable afterwards
+        assert html_cache.backend.read_meta(url_to_key("https://example.net/0"))["url"] == "https://example.net/0"
@@ -0,0 +1,18 @@
+from sqlite_cache import Shared, SQLiteCache, is_disabled
+
+
+def test_is_disabled():
+    assert all(is_disabled(value) for value in ("", "0", "off", " OFF ", "False", "no"))
+    assert not any(is_disabled(value) for value in ("on", "1", "cache.sqlite3"))
+
+
+def test_shared_instance_follows_setting(tmp_path):
+    setting = ["off"]
+    shared = Shared(lambda: setting[0], lambda: SQLiteCache(str(tmp_path / "c.sqlite3"), "t", "CREATE TABLE IF NOT EXISTS t (k TEXT)"))
+    assert shared.get() is None
+    setting[0] = "c.sqlite3"
+    cache = shared.get()
+    assert shared.get() is cache and cache.stats()["entries"] == 0
+    cache._count(True)
+    cache._count(False)
+    assert cache.stats()["hit_ratio"] == 0.5 and cache.clear() == 0